@@ -1,20 +1,34 @@
 """
 Script pour évaluer les trois modèles de recommandation
 """
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # Ajouter le dossier parent au path pour importer src
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.data.loader import load_data
-from src.models.collaborative import CollaborativeModel
+from src.data.binary_cache import artifact_hash, file_signature
+from src.data.loader import load_data, load_svd_model
+from src.data.catalog import ItemCatalog
+from src.data.interactions import InteractionStore
 from src.models.content_based import ContentBasedModel
 from src.models.hybrid import HybridModel
-from src.utils.preprocessing import create_user_train_test_split, get_relevant_items
-from src.utils.metrics import precision_at_k, recall_at_k, ndcg_at_k
-from src.config import SVD_CONFIG, SVD_MODEL_PATH, COSINE_SIM_PATH, HYBRID_CONFIG_PATH, EVALUATION_CONFIG , MLFLOW_EXPERIMENT_NAME , MLFLOW_TRACKING_URI
+from src.utils.preprocessing import create_user_train_test_split, relevant_items_csr
+from src.utils.metrics import RANKING_METRICS, ranking_metrics
+from src.config import (
+    SVD_CONFIG, SVD_MODEL_PATH, SVD_LEGACY_MODEL_PATH, COSINE_SIM_PATH, HYBRID_CONFIG_PATH,
+    EVALUATION_CONFIG, EVALUATION_CACHE_DIR, HYBRID_CONFIG, QUANTIZATION_CONFIG, RATINGS_FILE,
+    MOVIES_FILE, MLFLOW_EXPERIMENT_NAME, MLFLOW_TRACKING_URI
+)
 
 
 import mlflow
@@ -23,46 +37,246 @@ import mlflow.sklearn
 mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
 mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
 
-def evaluate_model(model, model_name, train_df, test_df, movies_df, k_values, sample_users=100):
+# État partagé avec les processus d'évaluation : rempli avant le fork, les
+# modèles (artefacts en mmap) sont hérités sans copie ni pickle
+_EVAL_STATE = {}
+
+
+def _recommend_shard(user_ids):
     """
-    Évalue un modèle sur plusieurs utilisateurs
+    Recommandations d'un lot d'utilisateurs (exécuté dans un processus du pool)
+    
+    Returns:
+        Tuple (matrice des item_id complétée par -1, liste des (user_id, erreur),
+        erreur du calcul groupé recommend_many ou None)
     """
-    print(f"\nÉvaluation de {model_name}...")
+    model = _EVAL_STATE['model']
+    train_df, catalog, n = _EVAL_STATE['train'], _EVAL_STATE['catalog'], _EVAL_STATE['n']
+    
+    batch_error = None
+    if hasattr(model, 'recommend_many'):
+        try:
+            return model.recommend_many(user_ids, train_df, catalog, n=n), [], None
+        except Exception as e:
+            # Repli utilisateur par utilisateur pour isoler ceux qui échouent
+            batch_error = f"{type(e).__name__}: {e}"
+    
+    recommendations = np.full((len(user_ids), n), -1, dtype=np.int64)
+    errors = []
+    for i, user_id in enumerate(user_ids):
+        try:
+            items = model.recommend(user_id, train_df, catalog, n=n)[:n]
+            recommendations[i, :len(items)] = items
+        except Exception as e:
+            errors.append((int(user_id), f"{type(e).__name__}: {e}"))
+    
+    return recommendations, errors, batch_error
+
+
+def recommend_all(model, user_ids, train_df, catalog, n, n_jobs=None, shard_size=256):
+    """
+    Recommandations de tous les utilisateurs, réparties sur un pool de processus
+    
+    Les processus sont créés par fork : modèles, catalogue et ratings sont
+    partagés en copy-on-write. Sans fork (ou n_jobs=1), exécution séquentielle.
+    
+    Returns:
+        Tuple (matrice len(user_ids) x n des item_id, masque des utilisateurs
+        en échec, liste des (user_id, erreur), liste des erreurs des lots
+        dont le calcul groupé a échoué)
+    """
+    _EVAL_STATE.update(model=model, train=train_df, catalog=catalog, n=n)
+    shards = [user_ids[start:start + shard_size] for start in range(0, len(user_ids), shard_size)]
+    n_jobs = n_jobs or os.cpu_count()
     
-    users = train_df['user_id'].unique()[:sample_users]
     results = []
+    if n_jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+            for result in executor.map(_recommend_shard, shards):
+                results.append(result)
+                print(f"  Progression : {min(len(results) * shard_size, len(user_ids))}/{len(user_ids)} utilisateurs")
+    else:
+        for shard in shards:
+            results.append(_recommend_shard(shard))
+            print(f"  Progression : {min(len(results) * shard_size, len(user_ids))}/{len(user_ids)} utilisateurs")
+    _EVAL_STATE.clear()
+    
+    recommendations = np.vstack([r[0] for r in results]) if results else np.empty((0, n), dtype=np.int64)
+    errors = [error for r in results for error in r[1]]
+    batch_errors = [r[2] for r in results if r[2] is not None]
+    failed = np.isin(user_ids, [user_id for user_id, _ in errors])
+    
+    return recommendations, failed, errors, batch_errors
+
+
+@functools.lru_cache(maxsize=None)
+def data_hash():
+    """
+    sha256 des fichiers des ratings et des films (calculés une fois par exécution)
+    """
+    return {
+        'ratings': file_signature(RATINGS_FILE)['sha256'],
+        'movies': file_signature(MOVIES_FILE)['sha256']
+    }
+
+
+def evaluation_cache_dir(model_name, artifacts, config=EVALUATION_CONFIG):
+    """
+    Répertoire de cache des recommandations d'un modèle
+    
+    La clé couvre tout ce dont dépendent les listes recommandées : contenu
+    des artefacts du modèle, des ratings et du catalogue des films
+    (films recommandables et leur ordre), paramètres et seed du split,
+    configuration lue au moment de recommander (re-classement quantifié,
+    fusion hybride), taille des listes et échantillon d'utilisateurs (pas
+    les K ni les métriques, recalculées depuis le cache).
     
-    for i, user_id in enumerate(users):
-        if (i + 1) % 25 == 0:
-            print(f"  Progression : {i+1}/{len(users)} utilisateurs")
+    Args:
+        model_name: Nom du modèle
+        artifacts: Fichiers ou répertoires des artefacts du modèle
+        config: Configuration d'évaluation
         
-        # Films pertinents
-        relevant = get_relevant_items(user_id, test_df, min_rating=4)
+    Returns:
+        Path du répertoire
+    """
+    key = json.dumps({
+        'artifacts': artifact_hash(*artifacts),
+        'data': data_hash(),
+        'recommend_config': {
+            'rerank_factor': QUANTIZATION_CONFIG['rerank_factor'],
+            'hybrid': HYBRID_CONFIG
+        },
+        'split': {name: config[name] for name in ('test_size', 'split_method', 'n_last', 'random_state')},
+        'n': config['n_recommendations'],
+        'sample_users': config['sample_users']
+    }, sort_keys=True)
+    slug = model_name.lower().replace('-', '_').replace(' ', '_')
+    
+    return EVALUATION_CACHE_DIR / f"{slug}_{hashlib.sha256(key.encode()).hexdigest()[:16]}"
+
+
+def load_recommendations(cache_dir, user_ids):
+    """
+    Relit les recommandations en cache (None si absentes ou pour d'autres utilisateurs)
+    
+    Returns:
+        Tuple (matrice des item_id, masque des échecs, statistiques) ou None
+    """
+    meta_path = cache_dir / 'meta.json'
+    if not meta_path.exists():
+        return None
+    
+    cached_users = np.load(cache_dir / 'user_ids.npy', allow_pickle=False)
+    if not np.array_equal(cached_users, user_ids):
+        return None
+    
+    with open(meta_path) as f:
+        stats = json.load(f)
+    
+    return (
+        np.load(cache_dir / 'recommendations.npy', allow_pickle=False),
+        np.load(cache_dir / 'failed.npy', allow_pickle=False),
+        stats
+    )
+
+
+def save_recommendations(cache_dir, user_ids, recommendations, failed, stats):
+    """
+    Écrit les recommandations d'un modèle dans le cache (.npy + meta.json)
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / 'meta.json').unlink(missing_ok=True)
+    
+    np.save(cache_dir / 'user_ids.npy', user_ids, allow_pickle=False)
+    np.save(cache_dir / 'recommendations.npy', recommendations, allow_pickle=False)
+    np.save(cache_dir / 'failed.npy', failed, allow_pickle=False)
+    
+    # Métadonnées écrites en dernier : un cache interrompu reste invalide
+    with open(cache_dir / 'meta.json', 'w') as f:
+        json.dump(stats, f, indent=2)
+
+
+def evaluate_model(model, model_name, train_df, test_df, catalog, k_values, artifacts=(), config=EVALUATION_CONFIG):
+    """
+    Évalue un modèle sur tous les utilisateurs ayant des films pertinents en test
+    
+    Les recommandations sont relues depuis le cache si les artefacts, le
+    split et n n'ont pas changé ; seules les métriques sont alors recalculées.
+    
+    Args:
+        artifacts: Fichiers ou répertoires des artefacts du modèle (clé du
+            cache ; aucun = pas de cache)
+    
+    Returns:
+        Tuple (DataFrame des métriques par utilisateur et par K, statistiques
+        de l'évaluation : utilisateurs, échecs, durée, utilisateurs/s, cache)
+    """
+    print(f"\nÉvaluation de {model_name}...")
+    
+    # Utilisateurs du train ayant au moins un film pertinent en test
+    users = train_df.user_ids
+    indptr, relevant = relevant_items_csr(users, test_df, min_rating=4)
+    users = users[np.diff(indptr) > 0][:config['sample_users']]
+    indptr, relevant = relevant_items_csr(users, test_df, min_rating=4)
+    
+    cache_dir = evaluation_cache_dir(model_name, artifacts, config) if artifacts and config['use_cache'] else None
+    cached = load_recommendations(cache_dir, users) if cache_dir is not None else None
+    
+    if cached is not None:
+        recommendations, failed, stats = cached
+        stats['cached'] = True
+        print(f"  Recommandations relues depuis le cache ({cache_dir.name})")
+    else:
+        start = time.perf_counter()
+        recommendations, failed, errors, batch_errors = recommend_all(
+            model, users, train_df, catalog, config['n_recommendations'],
+            n_jobs=config['n_jobs'], shard_size=config['shard_size']
+        )
+        seconds = time.perf_counter() - start
         
-        if len(relevant) == 0:
-            continue
+        if batch_errors:
+            print(f"  {len(batch_errors)} lots en échec sur recommend_many (sur {-(-len(users) // config['shard_size'])}), "
+                  f"recalculés utilisateur par utilisateur, ex : {batch_errors[:3]}")
+        if errors:
+            print(f"  {len(errors)} utilisateurs en échec (sur {len(users)}), ex : {errors[:3]}")
         
-        # Générer recommandations
-        try:
-            recommendations = model.recommend(user_id, train_df, movies_df, n=20)
-        except:
-            continue
+        stats = {
+            'n_users': len(users),
+            'failed_users': int(failed.sum()),
+            'failed_batches': len(batch_errors),
+            'seconds': seconds,
+            'users_per_sec': len(users) / seconds if seconds > 0 else 0.0
+        }
+        print(f"  {len(users)} utilisateurs en {seconds:.1f}s ({stats['users_per_sec']:.0f} utilisateurs/s)")
         
-        # Calculer métriques
-        for k in k_values:
-            precision = precision_at_k(recommendations, relevant, k)
-            recall = recall_at_k(recommendations, relevant, k)
-            ndcg = ndcg_at_k(recommendations, relevant, k)
-            
-            results.append({
-                'model': model_name,
-                'k': k,
-                'precision': precision,
-                'recall': recall,
-                'ndcg': ndcg
-            })
+        if cache_dir is not None:
+            save_recommendations(cache_dir, users, recommendations, failed, stats)
+        stats['cached'] = False
+    
+    # Métriques sur les utilisateurs sans échec
+    if failed.any():
+        indptr, relevant = relevant_items_csr(users[~failed], test_df, min_rating=4)
+    results = ranking_metrics(recommendations[~failed], indptr, relevant, k_values)
+    results.insert(0, 'model', model_name)
+    
+    return results, stats
+
+
+def log_evaluation(results, stats, k_values):
+    """
+    Logge dans le run MLflow actif les métriques moyennes et le débit
+    """
+    for k in k_values:
+        subset = results[results['k'] == k]
+        for metric in RANKING_METRICS:
+            mlflow.log_metric(f"{metric}_at_{k}", subset[metric].mean())
     
-    return pd.DataFrame(results)
+    mlflow.log_metric("evaluated_users", stats['n_users'])
+    mlflow.log_metric("failed_users", stats['failed_users'])
+    mlflow.log_metric("failed_batches", stats.get('failed_batches', 0))
+    mlflow.log_metric("users_per_sec", stats['users_per_sec'])
+    mlflow.log_param("recommendations_cached", stats['cached'])
 
 
 def main():
@@ -76,21 +290,28 @@ def main():
     # Charger les données
     print("\n1. Chargement des données...")
     ratings, movies = load_data()
+    catalog = ItemCatalog.from_movies(movies)
     
     # Créer train/test split
     print("\n2. Création du train/test split...")
     train_ratings, test_ratings = create_user_train_test_split(
         ratings, 
         test_size=EVALUATION_CONFIG['test_size'],
-        random_state=EVALUATION_CONFIG['random_state']
+        random_state=EVALUATION_CONFIG['random_state'],
+        method=EVALUATION_CONFIG['split_method'],
+        n_last=EVALUATION_CONFIG['n_last']
     )
     
     print(f"   Train : {len(train_ratings):,} ratings")
     print(f"   Test : {len(test_ratings):,} ratings")
     
+    # Index CSR des ratings, construits une seule fois pour tous les modèles
+    train_ratings = InteractionStore.from_ratings(train_ratings)
+    test_ratings = InteractionStore.from_ratings(test_ratings)
+    
     # Charger les modèles
     print("\n3. Chargement des modèles...")
-    collab_model = CollaborativeModel.load(SVD_MODEL_PATH)
+    collab_model = load_svd_model(mmap_mode='r')
     content_model = ContentBasedModel.load(COSINE_SIM_PATH)
     hybrid_model = HybridModel.load(
         HYBRID_CONFIG_PATH,
@@ -99,72 +320,38 @@ def main():
     )
     
     # Évaluer les modèles
-    print("\n4. Évaluation des modèles (100 utilisateurs)...")
+    sample_users = EVALUATION_CONFIG['sample_users']
+    print(f"\n4. Évaluation des modèles ({sample_users or 'tous les'} utilisateurs)...")
     k_values = EVALUATION_CONFIG['k_values']
     
     all_results = []
     
-    # Collaborative
-    
-    with mlflow.start_run(run_name="Evaluation Collaborative"):
-        
-        mlflow.log_params(SVD_CONFIG , {
-            "model_type" : 'Collaborative',
-            "Sample users" : 100,
-            "k_values" : str(k_values)
-        })
-        
-        collab_results = evaluate_model(
-            collab_model, "Collaborative", 
-            train_ratings, test_ratings, movies, k_values
-        )
-        all_results.append(collab_results)
-
-        for k in k_values :
-            subset = collab_results[collab_results['k'] == k]
-            mlflow.log_metric(f"precision_at_{k}", subset['precision'].mean())
-            mlflow.log_metric(f"recall_at_{k}", subset['recall'].mean())
-            mlflow.log_metric(f"ndcg_at_{k}", subset['ndcg'].mean())
-        
-    
+    # Artefacts de chaque modèle : clé du cache des recommandations
+    collab_artifacts = (SVD_MODEL_PATH, SVD_LEGACY_MODEL_PATH)
+    models = [
+        ("Collaborative", "Evaluation Collaborative", collab_model, SVD_CONFIG, collab_artifacts),
+        ("Content-Based", "Evaluation_ContentBased", content_model, {}, (COSINE_SIM_PATH,)),
+        ("Hybrid", "Evaluation_Hybrid", hybrid_model, {},
+         (HYBRID_CONFIG_PATH, COSINE_SIM_PATH) + collab_artifacts)
+    ]
     
-    # Content-Based
-    with mlflow.start_run(run_name="Evaluation_ContentBased"):
-        mlflow.log_param("model_type", "Content-Based")
-        mlflow.log_param("sample_users", 100)
-        mlflow.log_param("k_values", str(k_values))
-        
-        content_results = evaluate_model(
-            content_model, "Content-Based",
-            train_ratings, test_ratings, movies, k_values
-        )
-        all_results.append(content_results)
-        
-        # Logger les métriques moyennes
-        for k in k_values:
-            subset = content_results[content_results['k'] == k]
-            mlflow.log_metric(f"precision_at_{k}", subset['precision'].mean())
-            mlflow.log_metric(f"recall_at_{k}", subset['recall'].mean())
-            mlflow.log_metric(f"ndcg_at_{k}", subset['ndcg'].mean())
-    
-    # Hybrid
-    with mlflow.start_run(run_name="Evaluation_Hybrid"):
-        mlflow.log_param("model_type", "Hybrid")
-        mlflow.log_param("sample_users", 100)
-        mlflow.log_param("k_values", str(k_values))
-        
-        hybrid_results = evaluate_model(
-            hybrid_model, "Hybrid",
-            train_ratings, test_ratings, movies, k_values
-        )
-        all_results.append(hybrid_results)
-        
-        # Logger les métriques moyennes
-        for k in k_values:
-            subset = hybrid_results[hybrid_results['k'] == k]
-            mlflow.log_metric(f"precision_at_{k}", subset['precision'].mean())
-            mlflow.log_metric(f"recall_at_{k}", subset['recall'].mean())
-            mlflow.log_metric(f"ndcg_at_{k}", subset['ndcg'].mean())
+    for model_name, run_name, model, model_params, artifacts in models:
+        with mlflow.start_run(run_name=run_name):
+            mlflow.log_params({
+                **model_params,
+                "model_type": model_name,
+                "sample_users": sample_users or 'all',
+                "k_values": str(k_values),
+                "n_jobs": EVALUATION_CONFIG['n_jobs'] or os.cpu_count()
+            })
+            
+            results, stats = evaluate_model(
+                model, model_name,
+                train_ratings, test_ratings, catalog, k_values,
+                artifacts=artifacts
+            )
+            all_results.append(results)
+            log_evaluation(results, stats, k_values)
     
     # Combiner et afficher résultats
     print("\n" + "="*70)
@@ -172,11 +359,7 @@ def main():
     print("="*70)
     
     all_df = pd.concat(all_results, ignore_index=True)
-    summary = all_df.groupby(['model', 'k']).agg({
-        'precision': 'mean',
-        'recall': 'mean',
-        'ndcg': 'mean'
-    }).round(4)
+    summary = all_df.groupby(['model', 'k'])[list(RANKING_METRICS)].mean().round(4)
     
     print("\n", summary)
     
@@ -9,7 +9,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.data.loader import load_data
 from src.models.collaborative import CollaborativeModel
-from src.config import SVD_MODEL_PATH , MLFLOW_EXPERIMENT_NAME , MLFLOW_TRACKING_URI , SVD_CONFIG
+from src.config import SVD_MODEL_PATH , MLFLOW_EXPERIMENT_NAME , MLFLOW_TRACKING_URI , SVD_CONFIG , QUANTIZATION_CONFIG
 from surprise.model_selection import train_test_split
 import mlflow
 import mlflow.sklearn
@@ -57,6 +57,12 @@ def main():
         
         mlflow.log_metric("rmse", metrics['rmse'])
         mlflow.log_metric("mae", metrics['mae'])
+        # Copie quantifiée des facteurs films (scoring approché dans l'API)
+        if QUANTIZATION_CONFIG['dtype'] is not None:
+            print(f"\n   Quantification des facteurs films ({QUANTIZATION_CONFIG['dtype']})...")
+            model.quantize(QUANTIZATION_CONFIG['dtype'])
+            mlflow.log_param('quantization', QUANTIZATION_CONFIG['dtype'])
+        
         # Sauvegarder le modèle
         print("\n4. Sauvegarde du modèle...")
         model.save(SVD_MODEL_PATH)
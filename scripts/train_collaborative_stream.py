@@ -0,0 +1,61 @@
+"""
+Script pour entraîner le modèle Collaborative (SVD) en flux, sur des ratings plus gros que la RAM
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer src
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.streaming import ingest_ratings
+from src.models.collaborative import CollaborativeModel
+from src.config import (
+    RATINGS_FILE, RATINGS_COO_DIR, SVD_MODEL_PATH, MLFLOW_EXPERIMENT_NAME,
+    MLFLOW_TRACKING_URI, SVD_CONFIG, STREAMING_CONFIG, QUANTIZATION_CONFIG
+)
+import mlflow
+
+
+mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+
+
+def main(csv_path: Path = RATINGS_FILE):
+    """
+    Convertit le CSV des ratings en COO puis entraîne et sauvegarde le modèle
+
+    Args:
+        csv_path: CSV avec colonnes user_id, item_id, rating
+    """
+    print("="*70)
+    print("ENTRAÎNEMENT EN FLUX DU MODÈLE COLLABORATIVE FILTERING (SVD)")
+    print("="*70)
+
+    with mlflow.start_run(run_name='Collaborative_SVD_stream'):
+
+        print(f"\n1. Ingestion de {csv_path} par morceaux...")
+        ratings = ingest_ratings(csv_path, RATINGS_COO_DIR, chunk_size=STREAMING_CONFIG['chunk_size'])
+        print(f"   {len(ratings):,} ratings, {len(ratings.user_ids):,} utilisateurs, "
+              f"{len(ratings.item_ids):,} films")
+
+        mlflow.log_params({**SVD_CONFIG, **STREAMING_CONFIG, 'n_ratings': len(ratings)})
+
+        print("\n2. Entraînement...")
+        model = CollaborativeModel()
+        model.fit_stream(ratings)
+
+        if QUANTIZATION_CONFIG['dtype'] is not None:
+            print(f"\n   Quantification des facteurs films ({QUANTIZATION_CONFIG['dtype']})...")
+            model.quantize(QUANTIZATION_CONFIG['dtype'])
+            mlflow.log_param('quantization', QUANTIZATION_CONFIG['dtype'])
+
+        print("\n3. Sauvegarde du modèle...")
+        model.save(SVD_MODEL_PATH)
+
+        print("\n" + "="*70)
+        print("ENTRAÎNEMENT TERMINÉ AVEC SUCCÈS")
+        print("="*70)
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else RATINGS_FILE)
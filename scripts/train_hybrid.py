@@ -7,11 +7,10 @@ from pathlib import Path
 # Ajouter le dossier parent au path pour importer src
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.data.loader import load_data
-from src.models.collaborative import CollaborativeModel
+from src.data.loader import load_data, load_svd_model
 from src.models.content_based import ContentBasedModel
 from src.models.hybrid import HybridModel
-from src.config import SVD_MODEL_PATH, COSINE_SIM_PATH, HYBRID_CONFIG_PATH
+from src.config import COSINE_SIM_PATH, HYBRID_CONFIG_PATH
 
 
 def main():
@@ -28,7 +27,7 @@ def main():
     
     # Charger le modèle Collaborative
     print("\n2. Chargement du modèle Collaborative...")
-    collab_model = CollaborativeModel.load(SVD_MODEL_PATH)
+    collab_model = load_svd_model()
     
     # Charger le modèle Content-Based
     print("\n3. Chargement du modèle Content-Based...")
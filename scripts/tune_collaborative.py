@@ -0,0 +1,84 @@
+"""
+Script pour rechercher les hyperparamètres du modèle Collaborative Filtering (SVD)
+"""
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer src
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.loader import load_ratings
+from src.models.tuning import search
+from src.config import MLFLOW_EXPERIMENT_NAME, MLFLOW_TRACKING_URI
+import mlflow
+
+
+mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+
+
+# Valeurs testées pour chaque paramètre de SVD_CONFIG
+PARAM_GRID = {
+    'n_factors': [50, 100, 150],
+    'n_epochs': [20, 40],
+    'lr_all': [0.002, 0.005, 0.01],
+    'reg_all': [0.02, 0.05, 0.1]
+}
+
+
+def main():
+    """
+    Lance la recherche et logge chaque essai dans MLflow
+    """
+    print("="*70)
+    print("RECHERCHE D'HYPERPARAMÈTRES DU MODÈLE COLLABORATIVE (SVD)")
+    print("="*70)
+
+    with mlflow.start_run(run_name='Collaborative_SVD_tuning'):
+
+        # Charger les données
+        print("\n1. Chargement des données...")
+        ratings = load_ratings()
+
+        mlflow.log_params({'method': 'random', 'n_trials': 27, 'eta': 3})
+
+        # Chaque essai terminé est loggé comme run imbriqué
+        def log_trial(result):
+            print(f"   Essai {result['trial_id']} (palier {result['rung'] + 1}) : "
+                  f"RMSE {result['rmse']:.4f} en {result['seconds']:.1f} s")
+
+            with mlflow.start_run(run_name=f"trial_{result['trial_id']}_rung_{result['rung']}", nested=True):
+                mlflow.log_params(result['params'])
+                mlflow.log_params({'trial_id': result['trial_id'], 'rung': result['rung']})
+                mlflow.log_metrics({
+                    'rmse': result['rmse'],
+                    'mae': result['mae'],
+                    'seconds': result['seconds']
+                })
+
+        print("\n2. Recherche (successive halving)...")
+        start = time.perf_counter()
+        trials = search(ratings, PARAM_GRID, method='random', n_trials=27, eta=3, callback=log_trial)
+        elapsed = time.perf_counter() - start
+
+        best = trials.iloc[0]
+        print(f"\n3. Résultats ({len(trials)} essais en {elapsed:.1f} s, "
+              f"{trials['seconds'].mean():.1f} s par essai en moyenne) :")
+        print(trials.head(10).to_string(index=False))
+
+        mlflow.log_params({f"best_{name}": best[name] for name in PARAM_GRID})
+        mlflow.log_metrics({
+            'best_rmse': best['rmse'],
+            'best_mae': best['mae'],
+            'total_seconds': elapsed,
+            'mean_seconds_per_trial': trials['seconds'].mean()
+        })
+
+        print("\n" + "="*70)
+        print("RECHERCHE TERMINÉE : reporter les meilleurs paramètres dans SVD_CONFIG")
+        print("="*70)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,47 @@
 """
 Point d'entrée de l'API FastAPI
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from ..data.loader import load_catalog, load_id_maps
+from ..utils.cache import RecommendationCache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Charge une seule fois les ressources partagées par les requêtes
+    """
+    # Catalogue des films : lookups item_id -> position en O(1), sans DataFrame
+    try:
+        app.state.catalog = load_catalog()
+    except FileNotFoundError as e:
+        print(f"Catalogue non chargé : {e}")
+        app.state.catalog = None
+    
+    # Correspondances ID bruts <-> index contigus : les ID reçus sont
+    # convertis en bloc à l'entrée (to_index) et reconvertis en sortie (to_raw)
+    try:
+        app.state.user_map, app.state.item_map = load_id_maps(mmap_mode='r')
+    except FileNotFoundError as e:
+        print(f"Correspondances d'ID non chargées : {e}")
+        app.state.user_map, app.state.item_map = None, None
+    
+    # Cache LRU + TTL des recommandations, partagé par les endpoints
+    app.state.recommendation_cache = RecommendationCache()
+    
+    yield
+
+
 # Créer l'application FastAPI
 app = FastAPI(
     title="Recommendation System API",
     description="API REST pour un système de recommandation hybride de films",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurer CORS
@@ -24,5 +57,11 @@ app.add_middleware(
 def health_check():
     return {
         "status": "healthy",
-        "message": "API is running"
+        "message": "API is running",
+        "models_loaded": {
+            "catalog": getattr(app.state, "catalog", None) is not None,
+            "id_maps": getattr(app.state, "user_map", None) is not None
+        },
+        "cache": app.state.recommendation_cache.stats()
+        if hasattr(app.state, "recommendation_cache") else {}
     }
\ No newline at end of file
@@ -11,42 +11,100 @@ MODELS_DIR = BASE_DIR / "models"
 # Chemins des données
 RATINGS_FILE = PROCESSED_DATA_DIR / "ratings_clean.csv"
 MOVIES_FILE = PROCESSED_DATA_DIR / "movies_clean.csv"
+DATA_CACHE_DIR = DATA_DIR / "cache"  # Cache binaire des CSV (cf. src/data/binary_cache.py)
+ID_MAPS_DIR = PROCESSED_DATA_DIR / "id_maps"  # ID bruts triés (index contigu -> ID) : user_ids.npy, item_ids.npy
+EVALUATION_CACHE_DIR = DATA_CACHE_DIR / "evaluation"  # Recommandations calculées par scripts/evaluate.py
+RATINGS_COO_DIR = PROCESSED_DATA_DIR / "ratings_coo"  # Ratings au format COO en mmap (cf. src/data/streaming.py)
 
 # Chemins des modeles 
-SVD_MODEL_PATH = MODELS_DIR / "svd_model.pkl"
+SVD_MODEL_PATH = MODELS_DIR / "svd_model"  # Répertoire d'artefact (.npy + manifest.json)
+SVD_LEGACY_MODEL_PATH = MODELS_DIR / "svd_model.pkl"  # Ancien format (pickle Surprise)
 COSINE_SIM_PATH = MODELS_DIR / "cosine_sim_matrix.pkl"
 TFIDF_VECTORIZER_PATH = MODELS_DIR / "tfidf_vectorizer.pkl"
 HYBRID_CONFIG_PATH = MODELS_DIR / "hybrid_config.pkl"
 
+# Chargement des données
+DATA_LOADING_CONFIG = {
+    'use_cache': True,  # Relire les CSV depuis le cache binaire (reconstruit si la source change)
+    'rating_dtype': 'float32'  # 'float32', ou 'int8' si toutes les notes sont entières
+}
+
+# Ingestion et entraînement en flux (ratings plus gros que la RAM)
+STREAMING_CONFIG = {
+    'chunk_size': 1_000_000,  # Lignes du CSV lues à la fois
+    'block_size': 4_000_000,  # Ratings chargés en mémoire à la fois pendant l'entraînement
+    'batch_size': 1024  # Ratings par mini-lot de SGD
+}
+
 ## Mlflow 
 MLFLOW_TRACKING_URI = 'file:./mlruns'
 MLFLOW_EXPERIMENT_NAME = 'recommendation_system' 
 
 SVD_CONFIG = {
+    'algorithm': 'svd',  # 'svd' (SGD Surprise), 'als' (ALS explicite) ou 'als_implicit' (ALS sur confiances)
     'n_factors': 100,
     'n_epochs': 20,
     'lr_all': 0.005,
     'reg_all': 0.02,
+    'random_state': 42,
+    'als_epochs': 10,  # Itérations ALS (une demi-étape utilisateurs + une films)
+    'als_reg': 0.1,  # Régularisation ALS (pondérée par le nombre de ratings en explicite)
+    'als_alpha': 40.0,  # Confiance 1 + alpha * note (ALS implicite)
+    'als_n_jobs': None  # Threads ALS, None = nombre de cœurs
+}
+
+# Paramètres de l'index approximatif (IVF) sur les facteurs films du SVD
+ANN_CONFIG = {
+    'n_lists': None,  # Nombre de partitions k-means, None = 4 * sqrt(nb films)
+    'n_iter': 20,  # Nombre d'itérations de k-means
+    'n_probe': 8,  # Partitions explorées par requête (compromis rappel / latence)
     'random_state': 42
 }
 
+# Quantification des facteurs films du SVD (scoring approché + re-classement exact)
+QUANTIZATION_CONFIG = {
+    'dtype': None,  # None (pleine précision), 'float32' ou 'int8' (échelle par ligne)
+    'rerank_factor': 4  # Candidats re-scorés en pleine précision : rerank_factor x N
+}
+
 # Paramètres du modèle Content-Based
 CONTENT_CONFIG = {
     'min_rating': 4,  # Note minimum pour considérer qu'un film est aimé
-    'token_pattern': r'[A-Za-z-]+'  # Pattern pour TF-IDF
+    'token_pattern': r'[A-Za-z-]+',  # Pattern pour TF-IDF
+    'similarity': 'dense',  # 'dense' (matrice N x N), 'neighbors' (top-K voisins par film) ou 'profile' (profil TF-IDF)
+    'n_neighbors': 50,  # Nombre de voisins conservés par film (mode 'neighbors')
+    'chunk_size': 1024,  # Nombre de lignes de similarité calculées à la fois (mode 'neighbors')
+    'neighbor_dtype': 'float32'  # Type des similarités stockées : float32 ou float16
 }
 
 # Paramètres du modèle Hybrid
 HYBRID_CONFIG = {
     'alpha': 0.7,  # Poids du Collaborative
-    'beta': 0.3    # Poids du Content-Based
+    'beta': 0.3,    # Poids du Content-Based
+    'fusion': 'rank',  # 'rank' (rangs des top 50) ou 'score' (scores normalisés sur tout le catalogue)
+    'normalization': 'minmax',  # Normalisation des scores en mode 'score' : 'minmax' ou 'zscore'
+    'execution': 'sequential',  # 'sequential' ou 'threads' (les deux modèles en parallèle)
+    'timeout': None  # Délai max (secondes) par modèle en mode 'threads', None = pas de limite
+}
+
+# Paramètres du cache des recommandations
+CACHE_CONFIG = {
+    'max_entries': 100_000,  # Nombre maximum d'entrées (éviction LRU)
+    'ttl': 300  # Durée de vie d'une entrée en secondes
 }
 
 # Paramètres d'évaluation
 EVALUATION_CONFIG = {
     'test_size': 0.2,
+    'split_method': 'random',  # 'random', ou 'temporal' (ratings les plus récents en test)
+    'n_last': None,  # En mode 'temporal' : N derniers ratings en test par utilisateur (None = test_size)
     'k_values': [5, 10, 20],
-    'random_state': 42
+    'random_state': 42,
+    'n_recommendations': 20,  # Taille des listes évaluées (>= max(k_values))
+    'sample_users': None,  # Nombre d'utilisateurs évalués (None = tous)
+    'n_jobs': None,  # Processus d'évaluation (None = nombre de cœurs, 1 = séquentiel)
+    'shard_size': 256,  # Utilisateurs par tâche envoyée à un processus
+    'use_cache': True  # Réutiliser les recommandations déjà calculées (cf. EVALUATION_CACHE_DIR)
 }
 
 # Paramètres de l'API
@@ -0,0 +1,168 @@
+"""
+Cache binaire des données : évite de reparser les CSV à chaque script
+"""
+import hashlib
+import json
+import pickle
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_VERSION = 1
+META_FILE = 'meta.json'
+
+
+def file_signature(path: Path, with_hash: bool = True) -> dict:
+    """
+    Signature d'un fichier source : date de modification, taille et sha256
+
+    Args:
+        path: Fichier source
+        with_hash: Calculer aussi le sha256 (lecture complète du fichier)
+
+    Returns:
+        dict avec 'mtime_ns', 'size' et éventuellement 'sha256'
+    """
+    stat = Path(path).stat()
+    signature = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature['sha256'] = digest.hexdigest()
+
+    return signature
+
+
+def artifact_hash(*paths) -> str:
+    """
+    Empreinte sha256 d'un ensemble d'artefacts (fichiers ou répertoires)
+
+    Les fichiers d'un répertoire sont parcourus récursivement, par nom ;
+    un chemin absent compte comme vide.
+
+    Args:
+        *paths: Fichiers ou répertoires d'artefacts
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    for path in map(Path, paths):
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            if not file.exists():
+                continue
+            digest.update(str(file.relative_to(path) if path.is_dir() else file.name).encode())
+            digest.update(file_signature(file)['sha256'].encode())
+
+    return digest.hexdigest()
+
+
+def load_cached(
+    source: Path,
+    cache_dir: Path,
+    read_source: Callable[[], pd.DataFrame],
+    columnar: bool = True,
+    options: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Charge un DataFrame depuis le cache, ou depuis la source si le cache est périmé
+
+    Le cache est valide si la source a la même date de modification et la
+    même taille qu'à sa création ; sinon son sha256 est comparé (un fichier
+    recopié à l'identique ne reconstruit pas le cache). Changer les options
+    de lecture (ex : dtypes) reconstruit aussi le cache.
+
+    Args:
+        source: Fichier source (CSV)
+        cache_dir: Répertoire du cache de ce fichier
+        read_source: Fonction lisant la source (dtypes compacts déjà appliqués)
+        columnar: Un .npy par colonne (colonnes numériques, rechargement sans
+            pickle) ; sinon DataFrame picklé (colonnes texte ou catégorielles)
+        options: Options de lecture inscrites dans les métadonnées du cache
+
+    Returns:
+        DataFrame
+    """
+    cache_dir = Path(cache_dir)
+    meta_path = cache_dir / META_FILE
+
+    meta = None
+    if meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_VERSION or meta.get('options') != (options or {}):
+            meta = None
+
+    if meta is not None:
+        signature = file_signature(source, with_hash=False)
+        if (signature['mtime_ns'], signature['size']) == (meta['source']['mtime_ns'], meta['source']['size']):
+            return _read_cache(cache_dir, meta)
+
+        signature = file_signature(source)
+        if signature['sha256'] == meta['source']['sha256']:
+            # Contenu identique : seule la date a changé
+            meta['source'] = signature
+            _write_meta(meta_path, meta)
+            return _read_cache(cache_dir, meta)
+
+    df = read_source()
+    _write_cache(cache_dir, df, file_signature(source), columnar, options or {})
+
+    return df
+
+
+def _read_cache(cache_dir: Path, meta: dict) -> pd.DataFrame:
+    """
+    Relit un DataFrame écrit par _write_cache
+    """
+    if meta['columnar']:
+        return pd.DataFrame({
+            column: np.load(cache_dir / f"{column}.npy", allow_pickle=False)
+            for column in meta['columns']
+        })
+
+    with open(cache_dir / 'data.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+def _write_cache(cache_dir: Path, df: pd.DataFrame, signature: dict, columnar: bool, options: dict):
+    """
+    Écrit le cache d'un DataFrame et ses métadonnées
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / META_FILE).unlink(missing_ok=True)
+
+    # Colonnes non numériques : .npy impossible sans pickle
+    columnar = columnar and all(
+        pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+        for dtype in df.dtypes
+    )
+
+    if columnar:
+        for column in df.columns:
+            np.save(cache_dir / f"{column}.npy", df[column].to_numpy(), allow_pickle=False)
+    else:
+        with open(cache_dir / 'data.pkl', 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Métadonnées écrites en dernier : un cache interrompu reste invalide
+    _write_meta(cache_dir / META_FILE, {
+        'version': CACHE_VERSION,
+        'source': signature,
+        'columnar': columnar,
+        'options': options,
+        'columns': [str(column) for column in df.columns],
+        'dtypes': {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+    })
+
+
+def _write_meta(meta_path: Path, meta: dict):
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
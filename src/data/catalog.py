@@ -0,0 +1,107 @@
+"""
+Index du catalogue de films partagé par tous les modèles
+"""
+import numpy as np
+import pandas as pd
+from typing import Optional, Union
+
+from .ids import IdIndex
+
+
+class ItemCatalog:
+    """
+    Catalogue de films construit une seule fois à partir de load_movies()
+
+    Stocke les colonnes utiles sous forme de tableaux NumPy (position -> valeur)
+    et une table de correspondance item_id -> position en O(1).
+    """
+
+    def __init__(
+        self,
+        item_ids: np.ndarray,
+        titles: Optional[np.ndarray] = None,
+        genres: Optional[np.ndarray] = None
+    ):
+        """
+        Initialise le catalogue
+
+        Args:
+            item_ids: ID des films (position i <-> item_ids[i])
+            titles: Titres des films (même ordre)
+            genres: Genres des films (même ordre)
+        """
+        self.item_ids = np.asarray(item_ids)
+        self.titles = titles
+        self.genres = genres
+
+        self._index = IdIndex(self.item_ids)
+
+    @classmethod
+    def from_movies(cls, movies_df: pd.DataFrame):
+        """
+        Construit le catalogue à partir du DataFrame des films
+
+        Args:
+            movies_df: DataFrame avec colonnes item_id, title, genres
+
+        Returns:
+            Instance de ItemCatalog
+        """
+        return cls(
+            item_ids=movies_df['item_id'].to_numpy(),
+            titles=movies_df['title'].to_numpy() if 'title' in movies_df.columns else None,
+            genres=movies_df['genres'].to_numpy() if 'genres' in movies_df.columns else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def rows(self, item_ids) -> np.ndarray:
+        """
+        Convertit des item_id en positions dans le catalogue
+
+        Args:
+            item_ids: ID des films
+
+        Returns:
+            Tableau des positions (-1 si le film est inconnu)
+        """
+        return self._index.positions(item_ids)
+
+    def row(self, item_id) -> int:
+        """
+        Retourne la position d'un film dans le catalogue (-1 si inconnu)
+        """
+        return self._index.position(item_id)
+
+    def mask(self, item_ids) -> np.ndarray:
+        """
+        Construit un masque booléen du catalogue pour un ensemble de films
+
+        Args:
+            item_ids: ID des films à marquer (ex : films déjà vus)
+
+        Returns:
+            Masque booléen (une case par film du catalogue)
+        """
+        rows = self.rows(item_ids)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows[rows >= 0]] = True
+
+        return mask
+
+
+def as_catalog(movies: Union[ItemCatalog, pd.DataFrame]) -> ItemCatalog:
+    """
+    Retourne un ItemCatalog (construit à la volée depuis un DataFrame si besoin)
+
+    Args:
+        movies: ItemCatalog ou DataFrame des films
+
+    Returns:
+        Instance de ItemCatalog
+    """
+    if isinstance(movies, ItemCatalog):
+        return movies
+
+    return ItemCatalog.from_movies(movies)
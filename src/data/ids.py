@@ -0,0 +1,142 @@
+"""
+Index de correspondance ID bruts -> positions
+"""
+import numpy as np
+
+
+# Au-delà de ce facteur (max_id / nb d'ID), la table dense est remplacée
+# par une recherche dichotomique sur les ID triés
+DENSE_LOOKUP_MAX_RATIO = 4
+
+
+class IdIndex:
+    """
+    Correspondance ID brut -> position dans un tableau d'ID
+
+    Utilise une table dense (lookup en O(1)) quand les ID sont des entiers
+    positifs assez compacts, sinon une recherche dichotomique sur les ID triés.
+    En cas de doublons, la première position est retenue.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        """
+        Initialise l'index
+
+        Args:
+            ids: ID bruts (position i <-> ids[i])
+        """
+        ids = np.asarray(ids)
+        unique_ids, first_positions = np.unique(ids, return_index=True)
+
+        is_integer = np.issubdtype(ids.dtype, np.integer)
+        max_id = int(unique_ids[-1]) if is_integer and len(unique_ids) else 0
+        use_dense = (
+            is_integer
+            and (len(unique_ids) == 0 or unique_ids[0] >= 0)
+            and max_id < DENSE_LOOKUP_MAX_RATIO * len(unique_ids) + 1024
+        )
+
+        if use_dense:
+            self._table = np.full(max_id + 1, -1, dtype=np.int64)
+            self._table[unique_ids] = first_positions
+            self._sorted_ids = None
+            self._sorted_positions = None
+        else:
+            self._table = None
+            self._sorted_ids = unique_ids
+            self._sorted_positions = first_positions
+
+    def positions(self, ids) -> np.ndarray:
+        """
+        Convertit des ID bruts en positions
+
+        Args:
+            ids: ID bruts
+
+        Returns:
+            Tableau des positions (-1 si l'ID est inconnu)
+        """
+        ids = np.asarray(ids)
+
+        if self._table is not None:
+            if not np.issubdtype(ids.dtype, np.integer):
+                ids = ids.astype(np.int64)
+            in_range = (ids >= 0) & (ids < len(self._table))
+            positions = np.full(ids.shape, -1, dtype=np.int64)
+            positions[in_range] = self._table[ids[in_range]]
+            return positions
+
+        if len(self._sorted_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+
+        found_at = np.searchsorted(self._sorted_ids, ids)
+        found_at = np.minimum(found_at, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[found_at] == ids
+
+        return np.where(found, self._sorted_positions[found_at], -1)
+
+    def position(self, id_) -> int:
+        """
+        Retourne la position d'un ID brut (-1 si inconnu)
+        """
+        return int(self.positions(np.array([id_]))[0])
+
+
+class IdMapping:
+    """
+    Correspondance ID bruts <-> index contigus 0..n-1 (int32)
+
+    Les ID bruts sont stockés triés : l'index d'un ID est sa position
+    (conversion vectorisée par IdIndex), l'ID brut d'un index est ids[index].
+    """
+
+    def __init__(self, ids: np.ndarray):
+        """
+        Initialise la correspondance
+
+        Args:
+            ids: ID bruts uniques et triés (index i <-> ids[i])
+        """
+        self.ids = np.asarray(ids)
+        self._index = IdIndex(self.ids)
+
+    @classmethod
+    def from_values(cls, *values):
+        """
+        Construit la correspondance à partir de tous les ID rencontrés
+
+        Args:
+            *values: Un ou plusieurs tableaux d'ID bruts (doublons permis)
+
+        Returns:
+            Instance de IdMapping
+        """
+        return cls(np.unique(np.concatenate([np.asarray(v) for v in values])))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_index(self, ids) -> np.ndarray:
+        """
+        Convertit des ID bruts en index contigus (-1 si inconnu)
+        """
+        return self._index.positions(ids).astype(np.int32)
+
+    def to_raw(self, indices) -> np.ndarray:
+        """
+        Convertit des index contigus en ID bruts
+        """
+        return self.ids[np.asarray(indices)]
+
+    def save(self, path):
+        """
+        Sauvegarde les ID bruts triés (.npy)
+        """
+        np.save(path, self.ids, allow_pickle=False)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Charge une correspondance sauvegardée avec save
+        """
+        return cls(np.load(path, mmap_mode=mmap_mode, allow_pickle=False))
@@ -0,0 +1,243 @@
+"""
+Index des interactions utilisateur -> films (format CSR)
+"""
+import numpy as np
+import pandas as pd
+from typing import Tuple, Union
+
+from .catalog import ItemCatalog
+from .ids import IdIndex
+
+
+class InteractionStore:
+    """
+    Ratings regroupés par utilisateur, construits une seule fois
+
+    Format CSR : les films et notes de l'utilisateur i sont
+    item_ids[indptr[i]:indptr[i+1]] et ratings[indptr[i]:indptr[i+1]],
+    dans l'ordre d'origine du DataFrame.
+    """
+
+    def __init__(
+        self,
+        user_ids: np.ndarray,
+        indptr: np.ndarray,
+        item_ids: np.ndarray,
+        ratings: np.ndarray
+    ):
+        """
+        Initialise l'index
+
+        Args:
+            user_ids: ID des utilisateurs (ligne i <-> user_ids[i])
+            indptr: Offsets de chaque utilisateur (n_users + 1)
+            item_ids: ID des films notés, regroupés par utilisateur
+            ratings: Notes associées
+        """
+        self.user_ids = user_ids
+        self.indptr = indptr
+        self.item_ids = item_ids
+        self.ratings = ratings
+
+        self._index = IdIndex(user_ids)
+        self._catalog_cache = (None, None)
+        self._listeners = []
+
+    @classmethod
+    def from_ratings(cls, ratings_df: pd.DataFrame, rating_dtype=np.float32):
+        """
+        Construit l'index à partir du DataFrame des ratings
+
+        Args:
+            ratings_df: DataFrame avec colonnes user_id, item_id, rating
+            rating_dtype: Type de stockage des notes (float32, ou int8 si entières)
+
+        Returns:
+            Instance de InteractionStore
+        """
+        users = ratings_df['user_id'].to_numpy()
+        user_ids, user_rows = np.unique(users, return_inverse=True)
+
+        # Tri stable : l'ordre des ratings de chaque utilisateur est conservé
+        order = np.argsort(user_rows, kind='stable')
+        counts = np.bincount(user_rows, minlength=len(user_ids))
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        item_ids = _compact_ints(ratings_df['item_id'].to_numpy()[order])
+        ratings = ratings_df['rating'].to_numpy()[order].astype(rating_dtype)
+
+        return cls(_compact_ints(user_ids), indptr, item_ids, ratings)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    def user_row(self, user_id) -> int:
+        """
+        Retourne la ligne d'un utilisateur (-1 si inconnu)
+        """
+        return self._index.position(user_id)
+
+    def user_rows(self, user_ids) -> np.ndarray:
+        """
+        Retourne les lignes d'un ensemble d'utilisateurs (-1 si inconnu)
+        """
+        return self._index.positions(user_ids)
+
+    def _slice(self, user_id) -> slice:
+        row = self.user_row(user_id)
+        if row < 0:
+            return slice(0, 0)
+
+        return slice(self.indptr[row], self.indptr[row + 1])
+
+    def user_ratings(self, user_id) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retourne les films notés par un utilisateur et les notes associées
+
+        Args:
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Tuple (item_ids, ratings), vides si l'utilisateur est inconnu
+        """
+        span = self._slice(user_id)
+        return self.item_ids[span], self.ratings[span]
+
+    def seen_items(self, user_id) -> np.ndarray:
+        """
+        Retourne les films déjà notés par un utilisateur
+        """
+        return self.item_ids[self._slice(user_id)]
+
+    def liked_items(self, user_id, min_rating: float) -> np.ndarray:
+        """
+        Retourne les films notés au moins min_rating par un utilisateur
+        """
+        items, ratings = self.user_ratings(user_id)
+        return items[ratings >= min_rating]
+
+    def catalog_rows(self, catalog: ItemCatalog) -> np.ndarray:
+        """
+        Retourne la position catalogue de chaque interaction (-1 si hors catalogue)
+
+        Calculé une fois par catalogue puis réutilisé.
+        """
+        cached_catalog, cached_rows = self._catalog_cache
+        if cached_catalog is not catalog:
+            cached_rows = catalog.rows(self.item_ids)
+            self._catalog_cache = (catalog, cached_rows)
+
+        return cached_rows
+
+    def subscribe(self, callback):
+        """
+        Enregistre une fonction appelée avec user_id à chaque modification
+        des ratings d'un utilisateur (ex : RecommendationCache.invalidate_user)
+        """
+        self._listeners.append(callback)
+
+    def add_ratings(self, user_id, item_ids, ratings):
+        """
+        Ajoute ou met à jour des ratings d'un utilisateur
+
+        Les tableaux CSR sont réécrits (copie en O(nb ratings)) : adapté à un
+        flux modéré de nouveaux ratings ; pour un gros lot, reconstruire
+        l'index avec from_ratings.
+
+        Args:
+            user_id: ID de l'utilisateur (ajouté s'il est inconnu)
+            item_ids: ID des films notés
+            ratings: Notes associées
+        """
+        item_ids = np.asarray(item_ids).astype(self.item_ids.dtype)
+        ratings = np.asarray(ratings).astype(self.ratings.dtype)
+
+        row = self.user_row(user_id)
+        if row < 0:
+            # Nouvel utilisateur : nouvelle ligne vide à sa place dans l'ordre trié
+            row = int(np.searchsorted(self.user_ids, user_id))
+            self.user_ids = np.insert(self.user_ids, row, user_id)
+            self.indptr = np.insert(self.indptr, row, self.indptr[row])
+            self._index = IdIndex(self.user_ids)
+
+        start, stop = self.indptr[row], self.indptr[row + 1]
+
+        # Films déjà notés : mise à jour de la note en place
+        existing = self.item_ids[start:stop]
+        positions = {item: start + i for i, item in enumerate(existing.tolist())}
+        is_new = np.ones(len(item_ids), dtype=bool)
+        for i, item in enumerate(item_ids.tolist()):
+            if item in positions:
+                self.ratings[positions[item]] = ratings[i]
+                is_new[i] = False
+
+        # Nouveaux films : ajoutés à la fin de la ligne de l'utilisateur
+        n_new = int(is_new.sum())
+        if n_new:
+            self.item_ids = np.insert(self.item_ids, stop, item_ids[is_new])
+            self.ratings = np.insert(self.ratings, stop, ratings[is_new])
+            self.indptr[row + 1:] += n_new
+            self._catalog_cache = (None, None)
+
+        for callback in self._listeners:
+            callback(user_id)
+
+    def seen_mask(self, user_id, catalog: ItemCatalog) -> np.ndarray:
+        """
+        Construit le masque booléen des films du catalogue déjà notés
+
+        Args:
+            user_id: ID de l'utilisateur
+            catalog: Catalogue des films
+
+        Returns:
+            Masque booléen (une case par film du catalogue)
+        """
+        rows = self.catalog_rows(catalog)[self._slice(user_id)]
+        mask = np.zeros(len(catalog), dtype=bool)
+        mask[rows[rows >= 0]] = True
+
+        return mask
+
+
+def _compact_ints(values: np.ndarray) -> np.ndarray:
+    """
+    Convertit des ID entiers en int32 quand ils tiennent dans ce type
+    """
+    if (
+        np.issubdtype(values.dtype, np.integer)
+        and (len(values) == 0 or (values.min() >= np.iinfo(np.int32).min
+                                  and values.max() <= np.iinfo(np.int32).max))
+    ):
+        return values.astype(np.int32)
+
+    return values
+
+
+def as_interactions(
+    ratings: Union[InteractionStore, pd.DataFrame],
+    user_ids=None
+) -> InteractionStore:
+    """
+    Retourne un InteractionStore (construit à la volée depuis un DataFrame si besoin)
+
+    Args:
+        ratings: InteractionStore ou DataFrame des ratings
+        user_ids: Si ratings est un DataFrame, ne garder que ces utilisateurs
+            (évite de trier tout le DataFrame pour une seule requête)
+
+    Returns:
+        Instance de InteractionStore
+    """
+    if isinstance(ratings, InteractionStore):
+        return ratings
+
+    if user_ids is not None:
+        ratings = ratings[ratings['user_id'].isin(np.asarray(user_ids))]
+
+    return InteractionStore.from_ratings(ratings)
@@ -1,68 +1,203 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
-from ..config import RATINGS_FILE, MOVIES_FILE , SVD_MODEL_PATH , COSINE_SIM_PATH
+from typing import Optional, Tuple
+from ..config import (
+    RATINGS_FILE, MOVIES_FILE , SVD_MODEL_PATH , SVD_LEGACY_MODEL_PATH , COSINE_SIM_PATH , ID_MAPS_DIR ,
+    DATA_CACHE_DIR , DATA_LOADING_CONFIG
+)
+from .binary_cache import load_cached
+from .catalog import ItemCatalog
+from .ids import IdMapping
 import pickle
 
 
+# Types compacts des colonnes connues (les autres gardent le type par défaut)
+RATINGS_DTYPES = {'user_id': 'int32', 'item_id': 'int32', 'rating': 'float32'}
+MOVIES_DTYPES = {'item_id': 'int32', 'genres': 'category'}
 
-def load_ratings() -> pd.DataFrame:
+
+def load_ratings(use_cache: Optional[bool] = None) -> pd.DataFrame:
     """
     Charge les ratings nettoyés
     
+    Args:
+        use_cache: Lire depuis le cache binaire (default depuis config) ; les
+            ID sont alors en int32 et les notes en float32 (ou int8)
+    
     Returns:
         DataFrame avec les colonnes : user_id, item_id, rating, timestamp, etc.
     """
-    
-    ratings = pd.read_csv(RATINGS_FILE)
+    if use_cache is None:
+        use_cache = DATA_LOADING_CONFIG['use_cache']
+    
+    if use_cache:
+        rating_dtype = DATA_LOADING_CONFIG['rating_dtype']
+        ratings = load_cached(
+            RATINGS_FILE,
+            DATA_CACHE_DIR / "ratings",
+            lambda: _read_ratings_compact(rating_dtype),
+            columnar=True,
+            options={'dtypes': RATINGS_DTYPES, 'rating_dtype': rating_dtype}
+        )
+    else:
+        ratings = pd.read_csv(RATINGS_FILE)
     print(f"Ratings chargés : {len(ratings):,} lignes")
 
     
     return ratings
 
-def load_movies() -> pd.DataFrame:
+def _read_ratings_compact(rating_dtype: str = 'float32') -> pd.DataFrame:
+    """
+    Lit le CSV des ratings avec des types compacts
+    
+    Args:
+        rating_dtype: 'float32', ou 'int8' (appliqué seulement si toutes les notes sont entières)
+    """
+    ratings = pd.read_csv(RATINGS_FILE, dtype=RATINGS_DTYPES)
+    
+    if rating_dtype == 'int8':
+        values = ratings['rating'].to_numpy()
+        if np.all(values == np.round(values)):
+            ratings['rating'] = values.astype(np.int8)
+    
+    return ratings
+
+def load_movies(use_cache: Optional[bool] = None) -> pd.DataFrame:
     """
     Charge les informations sur les films
     
+    Args:
+        use_cache: Lire depuis le cache binaire (default depuis config) ; item_id
+            est alors en int32 et genres en catégoriel
+    
     Returns:
         DataFrame avec les colonnes : item_id, title, year, genres, etc.
     """
     if not MOVIES_FILE.exists():
         raise FileNotFoundError(f"Fichier movies introuvable : {MOVIES_FILE}")
     
-    movies = pd.read_csv(MOVIES_FILE)
+    if use_cache is None:
+        use_cache = DATA_LOADING_CONFIG['use_cache']
+    
+    if use_cache:
+        movies = load_cached(
+            MOVIES_FILE,
+            DATA_CACHE_DIR / "movies",
+            lambda: pd.read_csv(MOVIES_FILE, dtype=MOVIES_DTYPES),
+            columnar=False,
+            options={'dtypes': MOVIES_DTYPES}
+        )
+    else:
+        movies = pd.read_csv(MOVIES_FILE)
     
     print(f"Films chargés : {len(movies):,} lignes")
     
     return movies
 
-def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
+def load_catalog() -> ItemCatalog:
+    """
+    Charge le catalogue des films (index item_id -> position et colonnes)
+    
+    Returns:
+        ItemCatalog construit à partir de load_movies()
+    """
+    return ItemCatalog.from_movies(load_movies())
+
+def load_data(index_ids: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Charge à la fois les ratings et les films
     
+    Args:
+        index_ids: Ajouter des colonnes user_idx / item_idx (int32 contigus,
+            utilisables directement comme positions dans des tableaux NumPy)
+            et sauvegarder les correspondances dans ID_MAPS_DIR. Un modèle
+            entraîné sur ces index (renommés user_id / item_id) indexe ses
+            tableaux directement, sans recherche
+    
     Returns:
         Tuple (ratings_df, movies_df)
     """
     ratings = load_ratings()
     movies = load_movies()
     
+    if index_ids:
+        user_map, item_map = build_id_maps(ratings, movies)
+        
+        ratings['user_idx'] = user_map.to_index(ratings['user_id'].to_numpy())
+        ratings['item_idx'] = item_map.to_index(ratings['item_id'].to_numpy())
+        movies['item_idx'] = item_map.to_index(movies['item_id'].to_numpy())
+        
+        save_id_maps(user_map, item_map)
+        print(f"Index contigus : {len(user_map):,} utilisateurs, {len(item_map):,} films")
+    
     return ratings, movies
 
+def build_id_maps(ratings: pd.DataFrame, movies: pd.DataFrame) -> Tuple[IdMapping, IdMapping]:
+    """
+    Construit les correspondances ID bruts <-> index contigus
+    
+    Les films comprennent ceux du catalogue et ceux des ratings : item_idx est
+    le même dans les deux DataFrames.
+    
+    Returns:
+        Tuple (user_map, item_map)
+    """
+    user_map = IdMapping.from_values(ratings['user_id'].to_numpy())
+    item_map = IdMapping.from_values(movies['item_id'].to_numpy(), ratings['item_id'].to_numpy())
+    
+    return user_map, item_map
+
+def save_id_maps(user_map: IdMapping, item_map: IdMapping):
+    """
+    Sauvegarde les correspondances dans ID_MAPS_DIR (user_ids.npy, item_ids.npy)
+    """
+    ID_MAPS_DIR.mkdir(parents=True, exist_ok=True)
+    user_map.save(ID_MAPS_DIR / "user_ids.npy")
+    item_map.save(ID_MAPS_DIR / "item_ids.npy")
+
+def load_id_maps(mmap_mode=None) -> Tuple[IdMapping, IdMapping]:
+    """
+    Charge les correspondances sauvegardées par load_data(index_ids=True)
+    
+    Args:
+        mmap_mode: Mode mmap des tableaux ('r' pour partager les pages entre workers)
+    
+    Returns:
+        Tuple (user_map, item_map)
+    """
+    if not (ID_MAPS_DIR / "user_ids.npy").exists():
+        raise FileNotFoundError(f"Correspondances d'ID introuvables : {ID_MAPS_DIR}")
+    
+    return (
+        IdMapping.load(ID_MAPS_DIR / "user_ids.npy", mmap_mode=mmap_mode),
+        IdMapping.load(ID_MAPS_DIR / "item_ids.npy", mmap_mode=mmap_mode)
+    )
+
 import pickle
 
 
-def load_svd_model():
+def load_svd_model(mmap_mode=None):
     """
     Charge le modèle SVD sauvegardé
     
+    Utilise l'artefact compact (SVD_MODEL_PATH) s'il existe, sinon l'ancien
+    pickle Surprise (SVD_LEGACY_MODEL_PATH).
+    
+    Args:
+        mmap_mode: Mode mmap des tableaux ('r' pour partager les pages entre workers)
+    
     Returns:
-        Modèle SVD entraîné
+        CollaborativeModel entraîné
     """
-    if not SVD_MODEL_PATH.exists():
-        raise FileNotFoundError(f"Modèle SVD introuvable : {SVD_MODEL_PATH}")
+    from ..models.collaborative import CollaborativeModel
     
-    with open(SVD_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
+    if SVD_MODEL_PATH.exists():
+        model = CollaborativeModel.load(SVD_MODEL_PATH, mmap_mode=mmap_mode)
+    elif SVD_LEGACY_MODEL_PATH.exists():
+        model = CollaborativeModel.load(SVD_LEGACY_MODEL_PATH)
+    else:
+        raise FileNotFoundError(f"Modèle SVD introuvable : {SVD_MODEL_PATH}")
     
     print("Modèle SVD chargé")
     return model
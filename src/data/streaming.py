@@ -0,0 +1,181 @@
+"""
+Ingestion des ratings par morceaux vers un fichier COO mappé en mémoire
+"""
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+COO_META_FILE = 'meta.json'
+COO_COLUMNS = {'user_idx': np.int32, 'item_idx': np.int32, 'rating': np.float32}
+
+
+class _IncrementalIds:
+    """
+    Attribue des index contigus aux ID bruts dans l'ordre de première apparition
+    """
+
+    def __init__(self):
+        self.ids = []  # index -> ID brut, par morceau
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._sorted_idx = np.empty(0, dtype=np.int32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def encode(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Convertit un morceau d'ID bruts en index, en créant ceux des ID nouveaux
+        """
+        raw = raw.astype(np.int64)
+        unique_ids, first_seen = np.unique(raw, return_index=True)
+
+        positions = np.searchsorted(self._sorted_ids, unique_ids)
+        known = positions < len(self._sorted_ids)
+        known[known] = self._sorted_ids[positions[known]] == unique_ids[known]
+
+        # Nouveaux ID : numérotés dans leur ordre d'apparition dans le morceau
+        new_ids = unique_ids[~known][np.argsort(first_seen[~known], kind='stable')]
+        new_idx = np.arange(self._count, self._count + len(new_ids), dtype=np.int32)
+        self._count += len(new_ids)
+        self.ids.append(new_ids)
+
+        by_value = np.argsort(new_ids)
+        insert_at = np.searchsorted(self._sorted_ids, new_ids[by_value])
+        self._sorted_ids = np.insert(self._sorted_ids, insert_at, new_ids[by_value])
+        self._sorted_idx = np.insert(self._sorted_idx, insert_at, new_idx[by_value])
+
+        return self._sorted_idx[np.searchsorted(self._sorted_ids, raw)]
+
+    def raw_ids(self) -> np.ndarray:
+        return np.concatenate(self.ids) if self.ids else np.empty(0, dtype=np.int64)
+
+
+class RatingsCOO:
+    """
+    Ratings au format COO sur disque (une colonne par fichier binaire, lue en mmap)
+
+    Ligne k : utilisateur user_idx[k], film item_idx[k], note rating[k]. Les
+    index sont contigus ; user_ids[i] / item_ids[j] donnent les ID bruts.
+    """
+
+    def __init__(self, directory):
+        """
+        Ouvre un fichier COO écrit par ingest_ratings
+
+        Args:
+            directory: Répertoire du fichier COO
+        """
+        self.directory = Path(directory)
+        with open(self.directory / COO_META_FILE) as f:
+            self.meta = json.load(f)
+
+        n_ratings = self.meta['n_ratings']
+        self.columns = {
+            name: np.memmap(self.directory / f"{name}.bin", dtype=dtype, mode='r', shape=(n_ratings,))
+            if n_ratings else np.empty(0, dtype=dtype)
+            for name, dtype in COO_COLUMNS.items()
+        }
+        self.user_ids = np.load(self.directory / "user_ids.npy", allow_pickle=False)
+        self.item_ids = np.load(self.directory / "item_ids.npy", allow_pickle=False)
+
+    def __len__(self) -> int:
+        return self.meta['n_ratings']
+
+    @property
+    def global_mean(self) -> float:
+        return self.meta['global_mean']
+
+    def blocks(
+        self,
+        block_size: int,
+        rng: Optional[np.random.Generator] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Parcourt les ratings par blocs contigus, dans un ordre aléatoire
+
+        Seul le bloc courant est lu en mémoire ; l'ordre des ratings à
+        l'intérieur d'un bloc est mélangé par l'entraîneur.
+
+        Args:
+            block_size: Nombre de ratings par bloc
+            rng: Générateur pour l'ordre des blocs (None = ordre du fichier)
+
+        Yields:
+            Tuple (user_idx, item_idx, rating) du bloc
+        """
+        starts = np.arange(0, len(self), block_size)
+        if rng is not None:
+            rng.shuffle(starts)
+
+        for start in starts:
+            stop = start + block_size
+            yield tuple(np.array(self.columns[name][start:stop]) for name in COO_COLUMNS)
+
+
+def ingest_ratings(
+    csv_path,
+    directory,
+    chunk_size: int = 1_000_000
+) -> RatingsCOO:
+    """
+    Lit un CSV de ratings par morceaux et l'écrit au format COO, en une passe
+
+    Les correspondances ID bruts -> index contigus sont construites au fil
+    des morceaux ; la mémoire utilisée ne dépend que de chunk_size et du
+    nombre d'utilisateurs et de films, pas du nombre de ratings.
+
+    Args:
+        csv_path: CSV avec colonnes user_id, item_id, rating
+        directory: Répertoire du fichier COO (créé si besoin, écrasé sinon)
+        chunk_size: Nombre de lignes lues à la fois
+
+    Returns:
+        Instance de RatingsCOO
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / COO_META_FILE).unlink(missing_ok=True)
+
+    users, items = _IncrementalIds(), _IncrementalIds()
+    n_ratings, rating_sum = 0, 0.0
+
+    files = {name: open(directory / f"{name}.bin", 'wb') for name in COO_COLUMNS}
+    try:
+        reader = pd.read_csv(
+            csv_path,
+            usecols=['user_id', 'item_id', 'rating'],
+            dtype={'rating': np.float32},
+            chunksize=chunk_size
+        )
+        for i, chunk in enumerate(reader):
+            ratings = chunk['rating'].to_numpy(dtype=np.float32)
+            users.encode(chunk['user_id'].to_numpy()).astype(np.int32).tofile(files['user_idx'])
+            items.encode(chunk['item_id'].to_numpy()).astype(np.int32).tofile(files['item_idx'])
+            ratings.tofile(files['rating'])
+
+            n_ratings += len(chunk)
+            rating_sum += float(ratings.sum(dtype=np.float64))
+            print(f"  Morceau {i + 1} : {n_ratings:,} ratings, "
+                  f"{len(users):,} utilisateurs, {len(items):,} films")
+    finally:
+        for f in files.values():
+            f.close()
+
+    np.save(directory / "user_ids.npy", users.raw_ids(), allow_pickle=False)
+    np.save(directory / "item_ids.npy", items.raw_ids(), allow_pickle=False)
+
+    # Métadonnées écrites en dernier : une ingestion interrompue reste illisible
+    with open(directory / COO_META_FILE, 'w') as f:
+        json.dump({
+            'source': str(csv_path),
+            'n_ratings': n_ratings,
+            'n_users': len(users),
+            'n_items': len(items),
+            'global_mean': rating_sum / n_ratings if n_ratings else 0.0
+        }, f, indent=2)
+
+    return RatingsCOO(directory)
@@ -0,0 +1,240 @@
+"""
+Entraînement ALS (Alternating Least Squares) en NumPy, alternative au SVD Surprise
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+from .scoring import FactorScorer
+
+
+class ALS:
+    """
+    Factorisation de la matrice des ratings par moindres carrés alternés
+
+    Chaque demi-étape fixe un côté (films ou utilisateurs) et résout tous les
+    systèmes de l'autre côté par blocs : les matrices de Gram d'un bloc sont
+    calculées par un seul produit matriciel empilé (BLAS) puis résolues en un
+    appel à np.linalg.solve, les blocs étant répartis sur plusieurs threads.
+
+    Deux variantes :
+        - explicite : note = mu + bu + bi + <pu, qi>, régularisation pondérée
+          par le nombre de ratings (ALS-WR)
+        - implicite (Hu, Koren & Volinsky) : les notes deviennent des
+          confiances 1 + alpha * note, sans biais ; les scores obtenus sont
+          des préférences et non des notes
+    """
+
+    def __init__(
+        self,
+        n_factors: int = 100,
+        n_epochs: int = 10,
+        reg: float = 0.1,
+        implicit: bool = False,
+        alpha: float = 40.0,
+        random_state: int = 42,
+        n_jobs: Optional[int] = None,
+        block_elements: int = 2_000_000
+    ):
+        """
+        Initialise l'entraîneur
+
+        Args:
+            n_factors: Nombre de facteurs latents
+            n_epochs: Nombre d'itérations (une demi-étape utilisateurs + une films)
+            reg: Coefficient de régularisation
+            implicit: Variante implicite (confiances) au lieu de explicite (notes)
+            alpha: Pente de la confiance 1 + alpha * note (variante implicite)
+            random_state: Seed pour l'initialisation des facteurs
+            n_jobs: Nombre de threads résolvant les blocs (default : nb de cœurs)
+            block_elements: Taille max (en nombre de flottants) des facteurs
+                rassemblés pour un bloc de systèmes (mémoire bornée)
+        """
+        self.n_factors = n_factors
+        self.n_epochs = n_epochs
+        self.reg = reg
+        self.implicit = implicit
+        self.alpha = alpha
+        self.random_state = random_state
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.block_elements = block_elements
+
+    def fit(self, ratings_df: pd.DataFrame):
+        """
+        Entraîne le modèle sur les données de ratings
+
+        Args:
+            ratings_df: DataFrame avec colonnes user_id, item_id, rating
+
+        Returns:
+            self
+        """
+        user_ids, user_idx = np.unique(ratings_df['user_id'].to_numpy(), return_inverse=True)
+        item_ids, item_idx = np.unique(ratings_df['item_id'].to_numpy(), return_inverse=True)
+        ratings = ratings_df['rating'].to_numpy(dtype=np.float64)
+
+        # Deux vues CSR des mêmes ratings : par utilisateur et par film
+        by_user = _csr(user_idx, item_idx, ratings, len(user_ids))
+        by_item = _csr(item_idx, user_idx, ratings, len(item_ids))
+
+        rng = np.random.default_rng(self.random_state)
+        self.pu = rng.normal(0, 0.1, (len(user_ids), self.n_factors))
+        self.qi = rng.normal(0, 0.1, (len(item_ids), self.n_factors))
+        self.bu = np.zeros(len(user_ids))
+        self.bi = np.zeros(len(item_ids))
+        self.global_mean = 0.0 if self.implicit else float(ratings.mean())
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+
+        for _ in range(self.n_epochs):
+            if self.implicit:
+                self.pu = self._solve_implicit(by_user, self.qi)
+                self.qi = self._solve_implicit(by_item, self.pu)
+            else:
+                self.pu, self.bu = self._solve_explicit(by_user, self.qi, self.bi)
+                self.qi, self.bi = self._solve_explicit(by_item, self.pu, self.bu)
+
+        return self
+
+    def to_scorer(self) -> FactorScorer:
+        """
+        Construit le moteur de scoring à partir des facteurs appris
+
+        Returns:
+            Instance de FactorScorer (notes écrêtées entre 1 et 5 en explicite,
+            scores de préférence non écrêtés en implicite)
+        """
+        return FactorScorer(
+            user_factors=self.pu,
+            item_factors=self.qi,
+            user_bias=self.bu,
+            item_bias=self.bi,
+            global_mean=self.global_mean,
+            user_ids=self.user_ids,
+            item_ids=self.item_ids,
+            rating_scale=None if self.implicit else (1, 5)
+        )
+
+    def _solve_explicit(
+        self,
+        csr: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        fixed_factors: np.ndarray,
+        fixed_bias: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Demi-étape explicite : résout [x, b] pour chaque ligne de la CSR
+
+        Pour la ligne u : min sum (r - mu - b_fixe - <x, y> - b)² + reg * n_u * ||[x, b]||²
+        """
+        # Le biais appris est une coordonnée de plus, de facteur fixe 1
+        features = np.hstack([fixed_factors, np.ones((len(fixed_factors), 1))])
+        # Une case de plus pour la colonne de complément (cf. _solve_rows)
+        offsets = np.append(self.global_mean + fixed_bias, 0.0)
+        eye = np.eye(features.shape[1])
+
+        def solve(F, valid, ratings, cols, counts):
+            targets = np.where(valid, ratings - offsets[cols], 0.0)
+            A = F.transpose(0, 2, 1) @ F + (self.reg * np.maximum(counts, 1))[:, None, None] * eye
+            b = F.transpose(0, 2, 1) @ targets[..., None]
+            return np.linalg.solve(A, b)[..., 0]
+
+        solution = _solve_rows(csr, features, solve, self.block_elements, self.n_jobs)
+
+        return solution[:, :-1], solution[:, -1]
+
+    def _solve_implicit(
+        self,
+        csr: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        fixed_factors: np.ndarray
+    ) -> np.ndarray:
+        """
+        Demi-étape implicite : (YᵀY + Yᵀ(C_u - I)Y + reg I) x = Yᵀ C_u 1
+        """
+        gram = fixed_factors.T @ fixed_factors + self.reg * np.eye(fixed_factors.shape[1])
+
+        def solve(F, valid, ratings, cols, counts):
+            confidence = np.where(valid, 1 + self.alpha * ratings, 0.0)
+            A = gram + F.transpose(0, 2, 1) @ (F * (confidence - valid)[..., None])
+            b = F.transpose(0, 2, 1) @ confidence[..., None]
+            return np.linalg.solve(A, b)[..., 0]
+
+        return _solve_rows(csr, fixed_factors, solve, self.block_elements, self.n_jobs)
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, values: np.ndarray, n_rows: int):
+    """
+    Regroupe des triplets (ligne, colonne, valeur) au format CSR
+    """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+
+    return indptr, cols[order], values[order]
+
+
+def _solve_rows(csr, features: np.ndarray, solve, block_elements: int, n_jobs: int = 1) -> np.ndarray:
+    """
+    Résout un système par ligne de la CSR, par blocs de lignes de tailles voisines
+
+    Les lignes sont triées par nombre de ratings : dans un bloc, les facteurs
+    fixes de chaque ligne sont rassemblés dans un tenseur (bloc x max ratings
+    x n_factors) complété par des zéros, avec peu de perte. Les blocs sont
+    indépendants : NumPy relâchant le GIL dans les produits matriciels et
+    np.linalg.solve, ils peuvent être traités par plusieurs threads.
+
+    Args:
+        csr: Tuple (indptr, colonnes, notes)
+        features: Facteurs du côté fixé (une ligne par colonne de la CSR)
+        solve: Fonction (F, valid, ratings, cols, counts) -> solutions du bloc
+            (les cases de complément ont pour colonne len(features))
+        block_elements: Taille max du tenseur d'un bloc (en nombre de flottants)
+        n_jobs: Nombre de threads
+
+    Returns:
+        Matrice des solutions (une ligne par ligne de la CSR)
+    """
+    indptr, cols, ratings = csr
+    counts = np.diff(indptr)
+    order = np.argsort(counts, kind='stable')
+    sorted_counts = np.maximum(counts[order], 1)
+    n_features = features.shape[1]
+
+    solution = np.zeros((len(counts), n_features))
+    padded = np.vstack([features, np.zeros((1, n_features))])
+
+    # Découpage : plus grands blocs tels que nb lignes x max ratings x n_features
+    # reste borné (les lignes étant triées, le max est celui de la dernière)
+    blocks = []
+    start = 0
+    while start < len(order):
+        window = sorted_counts[start:start + max(1, block_elements // (sorted_counts[start] * n_features))]
+        sizes = np.arange(1, len(window) + 1) * window * n_features
+        size = max(1, int(np.searchsorted(sizes, block_elements, side='right')))
+        blocks.append(order[start:start + size])
+        start += size
+
+    def solve_block(block):
+        max_count = max(int(counts[block[-1]]), 1)
+
+        positions = indptr[block][:, None] + np.arange(max_count)
+        valid = np.arange(max_count) < counts[block][:, None]
+        positions = np.where(valid, positions, 0)
+
+        # Les cases de complément pointent sur la ligne de zéros ajoutée en fin
+        block_cols = np.where(valid, cols[positions], len(features))
+        block_ratings = ratings[positions]
+        F = padded[block_cols]
+
+        solution[block] = solve(F, valid, block_ratings, block_cols, counts[block])
+
+    if n_jobs > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            list(executor.map(solve_block, blocks))
+    else:
+        for block in blocks:
+            solve_block(block)
+
+    return solution
@@ -0,0 +1,188 @@
+"""
+Index approximatif de recherche par produit scalaire maximal (IVF) sur les
+facteurs films d'un modèle SVD
+"""
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+
+ANN_INDEX_FILE = 'ann_index.npz'
+
+
+def augment_items(item_factors: np.ndarray, item_bias: np.ndarray) -> np.ndarray:
+    """
+    Vecteurs films [qi, bi, sqrt(M² - ||qi||² - bi²)] de norme commune M
+
+    Avec la requête [pu, 1, 0], le produit scalaire vaut <pu, qi> + bi : mu + bu
+    étant constant pour un utilisateur, il donne le même classement que la
+    note prédite (hors écrêtage). La dernière coordonnée ramène tous les films
+    sur la même sphère, où le produit scalaire maximal correspond au plus
+    proche voisin euclidien : k-means partitionne alors selon ce critère.
+    """
+    vectors = np.hstack([item_factors, item_bias[:, None]]).astype(np.float64)
+    norms = (vectors ** 2).sum(axis=1)
+    extra = np.sqrt(np.maximum(norms.max() - norms, 0))
+
+    return np.hstack([vectors, extra[:, None]]).astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Index IVF (inverted file) : les films sont partitionnés par k-means, une
+    requête ne score que les films des n_probe partitions dont le centroïde a
+    le plus grand produit scalaire avec le vecteur utilisateur
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        list_items: np.ndarray,
+        n_probe: int = 8
+    ):
+        """
+        Initialise l'index
+
+        Args:
+            centroids: Centroïdes des partitions (n_lists x (n_factors + 2))
+            list_offsets: Offsets des partitions dans list_items (n_lists + 1)
+            list_items: Lignes des films (index des facteurs), regroupées par partition
+            n_probe: Nombre de partitions explorées par défaut
+        """
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_items = list_items
+        self.n_probe = n_probe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        item_factors: np.ndarray,
+        item_bias: np.ndarray,
+        n_lists: Optional[int] = None,
+        n_iter: int = 20,
+        n_probe: int = 8,
+        random_state: int = 42,
+        chunk_size: int = 65536
+    ):
+        """
+        Construit l'index par k-means sur les vecteurs augmentés (cf. augment_items)
+
+        Args:
+            item_factors: Facteurs films qi (n_items x n_factors)
+            item_bias: Biais films bi (n_items)
+            n_lists: Nombre de partitions (default : 4 * sqrt(n_items))
+            n_iter: Nombre d'itérations de k-means
+            n_probe: Nombre de partitions explorées par défaut
+            random_state: Seed pour reproductibilité
+            chunk_size: Nombre de films affectés à la fois (mémoire bornée)
+
+        Returns:
+            Instance de IVFIndex
+        """
+        vectors = augment_items(item_factors, item_bias)
+        n_items = len(vectors)
+
+        if n_lists is None:
+            n_lists = int(4 * np.sqrt(n_items))
+        n_lists = max(1, min(n_lists, n_items))
+
+        rng = np.random.default_rng(random_state)
+        centroids = vectors[rng.choice(n_items, n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = _assign(vectors, centroids, chunk_size)
+
+            counts = np.bincount(labels, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, vectors)
+
+            # Une partition vide garde son centroïde
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        labels = _assign(vectors, centroids, chunk_size)
+        order = np.argsort(labels, kind='stable')
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=list_offsets[1:])
+
+        return cls(centroids, list_offsets, order.astype(np.int32), n_probe=n_probe)
+
+    def candidates(self, user_vector: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """
+        Retourne les films des partitions les plus prometteuses pour un utilisateur
+
+        Args:
+            user_vector: Facteurs de l'utilisateur pu
+            n_probe: Nombre de partitions explorées (default : self.n_probe)
+
+        Returns:
+            Lignes des films candidats (index des facteurs)
+        """
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        query = np.append(user_vector, [1.0, 0.0]).astype(np.float32)
+
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        return np.concatenate([
+            self.list_items[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes
+        ])
+
+    def save(self, directory):
+        """
+        Sauvegarde l'index à côté de l'artefact du modèle
+
+        Args:
+            directory: Répertoire de l'artefact du modèle
+        """
+        np.savez(
+            Path(directory) / ANN_INDEX_FILE,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_items=self.list_items,
+            n_probe=np.array(self.n_probe)
+        )
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Charge l'index sauvegardé dans le répertoire d'un artefact
+
+        Args:
+            directory: Répertoire de l'artefact du modèle
+
+        Returns:
+            Instance de IVFIndex, ou None si aucun index n'a été sauvegardé
+        """
+        path = Path(directory) / ANN_INDEX_FILE
+        if not path.exists():
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                centroids=data['centroids'],
+                list_offsets=data['list_offsets'],
+                list_items=data['list_items'],
+                n_probe=int(data['n_probe'])
+            )
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int) -> np.ndarray:
+    """
+    Affecte chaque vecteur au centroïde le plus proche (distance euclidienne)
+    """
+    labels = np.empty(len(vectors), dtype=np.int64)
+    centroid_norms = (centroids ** 2).sum(axis=1)
+
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        # argmin ||x - c||² = argmax 2 <x, c> - ||c||²
+        labels[start:start + chunk_size] = np.argmax(2 * chunk @ centroids.T - centroid_norms, axis=1)
+
+    return labels
@@ -1,17 +1,27 @@
 """
-Modèle de Collaborative Filtering basé sur SVD
+Modèle de Collaborative Filtering basé sur SVD (ou ALS)
 """
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from surprise import SVD, Dataset, Reader, Trainset
-from typing import List
+from typing import List, Optional, Union
 
-from ..config import SVD_CONFIG
+from .als import ALS
+from .ann import IVFIndex
+from .scoring import FactorScorer, atomic_directory, is_artifact
+from .sgd import grow_scorer, sgd_epochs
+from ..data.catalog import ItemCatalog, as_catalog
+from ..data.interactions import InteractionStore, as_interactions
+from ..data.streaming import RatingsCOO
+from ..utils.metrics import rating_errors
+from ..utils.ranking import top_n_indices, top_n_rows
+from ..config import ANN_CONFIG, QUANTIZATION_CONFIG, STREAMING_CONFIG, SVD_CONFIG
 
 
 class CollaborativeModel:
     """
-    Modèle de Collaborative Filtering utilisant SVD (Surprise)
+    Modèle de Collaborative Filtering utilisant SVD (Surprise) ou ALS (NumPy)
     """
     
     def __init__(self, **kwargs):
@@ -19,19 +29,40 @@ class CollaborativeModel:
         Initialise le modèle SVD
         
         Args:
-            **kwargs: Paramètres pour SVD (n_factors, n_epochs, lr_all, reg_all)
+            **kwargs: Paramètres pour SVD (n_factors, n_epochs, lr_all, reg_all),
+                algorithm ('svd', 'als' ou 'als_implicit') et paramètres ALS
+                (als_epochs, als_reg, als_alpha, als_n_jobs)
         """
         # Fusionner les paramètres par défaut avec ceux fournis
         params = {**SVD_CONFIG, **kwargs}
-        
-        self.algo = SVD(
-            n_factors=params['n_factors'],
-            n_epochs=params['n_epochs'],
-            lr_all=params['lr_all'],
-            reg_all=params['reg_all'],
-            random_state=params['random_state']
-        )
-        
+        self.params = params
+        
+        if params['algorithm'] == 'svd':
+            self.algo = SVD(
+                n_factors=params['n_factors'],
+                n_epochs=params['n_epochs'],
+                lr_all=params['lr_all'],
+                reg_all=params['reg_all'],
+                random_state=params['random_state']
+            )
+        elif params['algorithm'] in ('als', 'als_implicit'):
+            self.algo = ALS(
+                n_factors=params['n_factors'],
+                n_epochs=params['als_epochs'],
+                reg=params['als_reg'],
+                implicit=params['algorithm'] == 'als_implicit',
+                alpha=params['als_alpha'],
+                random_state=params['random_state'],
+                n_jobs=params['als_n_jobs']
+            )
+        else:
+            raise ValueError(f"Algorithme inconnu : {params['algorithm']}")
+        
+        self.scorer = None
+        self.ann_index = None
+        self._catalog_cache = (None, None, None)
+        self._inverse_cache = (None, None, None)
+        self._gram_cache = (None, None)
         self.is_trained = False
         
     
@@ -43,6 +74,13 @@ class CollaborativeModel:
             ratings_df: DataFrame avec colonnes user_id, item_id, rating
         """
         
+        if isinstance(self.algo, ALS):
+            print("Entraînement du modèle Collaborative (ALS)...")
+            self.scorer = self.algo.fit(ratings_df).to_scorer()
+            self.is_trained = True
+            print("Entraînement terminé")
+            return
+        
         reader = Reader(rating_scale=(1,5))
         data = Dataset.load_from_df(ratings_df[['user_id' , 'item_id' , 'rating']] , reader = reader)
         
@@ -51,6 +89,7 @@ class CollaborativeModel:
         # Entraîner
         print("Entraînement du modèle Collaborative (SVD)...")
         self.algo.fit(trainset)
+        self.scorer = FactorScorer.from_surprise(self.algo)
         self.is_trained = True
         print("Entraînement terminé")
         
@@ -67,7 +106,6 @@ class CollaborativeModel:
             dict avec 'rmse' et 'mae'
         """
         from surprise.model_selection import train_test_split
-        from surprise import accuracy
         
         # Créer le dataset
         reader = Reader(rating_scale=(1, 5))
@@ -81,24 +119,175 @@ class CollaborativeModel:
         
         # Entraîner
         print(f"Entraînement sur {trainset.n_ratings} ratings...")
-        self.algo.fit(trainset)
+        if isinstance(self.algo, ALS):
+            # Même split que pour SVD, repassé en DataFrame pour ALS
+            train_df = pd.DataFrame(
+                [(trainset.to_raw_uid(u), trainset.to_raw_iid(i), r) for u, i, r in trainset.all_ratings()],
+                columns=['user_id', 'item_id', 'rating']
+            )
+            self.scorer = self.algo.fit(train_df).to_scorer()
+        else:
+            self.algo.fit(trainset)
+            self.scorer = FactorScorer.from_surprise(self.algo)
         self.is_trained = True
         
-        # Évaluer sur test set
+        # Évaluer sur test set (prédictions vectorisées)
         print(f"Évaluation sur {len(testset)} ratings...")
-        predictions = self.algo.test(testset)
+        test_users, test_items, test_ratings = (np.array(column) for column in zip(*testset))
+        predictions = self.predict_many(test_users, test_items)
         
         # Calculer métriques
-        rmse = accuracy.rmse(predictions, verbose=False)
-        mae = accuracy.mae(predictions, verbose=False)
-        
-        return {
-            'rmse': rmse,
-            'mae': mae
-        }
+        return rating_errors(predictions, test_ratings)
         
         
     
+    def partial_fit(
+        self,
+        new_ratings_df: pd.DataFrame,
+        epochs: int = 5,
+        history: Optional[pd.DataFrame] = None,
+        replay_ratio: float = 1.0,
+        batch_size: int = 1024
+    ):
+        """
+        Reprend l'entraînement à partir des facteurs existants (entraînement incrémental)
+
+        Les tables de facteurs sont agrandies pour les utilisateurs et films
+        inconnus, puis quelques passes de SGD (mêmes lr_all et reg_all que
+        l'entraînement) sont faites sur les nouveaux ratings, mélangés à un
+        échantillon des anciens pour ne pas dériver vers les seules nouvelles données.
+
+        Args:
+            new_ratings_df: Nouveaux ratings (colonnes user_id, item_id, rating)
+            epochs: Nombre de passes
+            history: Anciens ratings dans lesquels échantillonner (None = aucun)
+            replay_ratio: Nombre d'anciens ratings rejoués par nouveau rating
+            batch_size: Nombre de ratings par mini-lot
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant un entraînement incrémental")
+        if self.params['algorithm'] == 'als_implicit':
+            raise ValueError("partial_fit n'est pas disponible pour l'ALS implicite")
+
+        train_df = new_ratings_df[['user_id', 'item_id', 'rating']]
+        if history is not None and replay_ratio > 0:
+            n_replay = min(int(len(new_ratings_df) * replay_ratio), len(history))
+            replay = history[['user_id', 'item_id', 'rating']].sample(
+                n=n_replay, random_state=self.params['random_state']
+            )
+            train_df = pd.concat([train_df, replay], ignore_index=True)
+
+        scorer = grow_scorer(
+            self.scorer,
+            new_ratings_df['user_id'].to_numpy(),
+            new_ratings_df['item_id'].to_numpy(),
+            random_state=self.params['random_state']
+        )
+
+        print(f"Entraînement incrémental sur {len(new_ratings_df)} nouveaux ratings "
+              f"(+ {len(train_df) - len(new_ratings_df)} anciens)...")
+        # Anciens ratings d'utilisateurs ou de films absents du modèle : ignorés
+        users = scorer.user_indices(train_df['user_id'].to_numpy())
+        items = scorer.item_indices(train_df['item_id'].to_numpy())
+        known = (users >= 0) & (items >= 0)
+        
+        sgd_epochs(
+            scorer,
+            users[known],
+            items[known],
+            train_df['rating'].to_numpy(dtype=np.float64)[known],
+            n_epochs=epochs,
+            lr=self.params['lr_all'],
+            reg=self.params['reg_all'],
+            batch_size=batch_size,
+            random_state=self.params['random_state']
+        )
+        if self.scorer.quantization is not None:
+            scorer.quantize(self.scorer.quantization)
+        self.scorer = scorer
+
+        # Les films ont changé : reconstruire l'index ANN s'il existe
+        if self.ann_index is not None:
+            self.build_ann_index(n_lists=self.ann_index.n_lists, n_probe=self.ann_index.n_probe)
+
+        print("Entraînement terminé")
+
+    def fit_stream(
+        self,
+        ratings: Union[RatingsCOO, str],
+        block_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Entraîne le modèle par SGD sur des ratings au format COO, bloc par bloc
+
+        Pour les ratings qui ne tiennent pas en mémoire (cf. ingest_ratings) :
+        à chaque époque les blocs sont lus dans un ordre aléatoire depuis le
+        fichier mappé, et seuls le bloc courant et les facteurs sont en RAM.
+        Mêmes initialisation et règle de mise à jour que SVD (n_factors,
+        n_epochs, lr_all, reg_all).
+
+        Args:
+            ratings: Instance de RatingsCOO ou répertoire du fichier COO
+            block_size: Ratings chargés à la fois (default : STREAMING_CONFIG)
+            batch_size: Ratings par mini-lot (default : STREAMING_CONFIG)
+        """
+        if self.params['algorithm'] != 'svd':
+            raise ValueError("fit_stream n'est disponible que pour l'algorithme 'svd'")
+        if not isinstance(ratings, RatingsCOO):
+            ratings = RatingsCOO(ratings)
+        block_size = block_size or STREAMING_CONFIG['block_size']
+        batch_size = batch_size or STREAMING_CONFIG['batch_size']
+
+        rng = np.random.default_rng(self.params['random_state'])
+        n_factors = self.params['n_factors']
+        n_users, n_items = len(ratings.user_ids), len(ratings.item_ids)
+
+        # Lignes des facteurs = index contigus du fichier COO (ordre d'apparition)
+        scorer = FactorScorer(
+            user_factors=rng.normal(0, 0.1, (n_users, n_factors)),
+            item_factors=rng.normal(0, 0.1, (n_items, n_factors)),
+            user_bias=np.zeros(n_users),
+            item_bias=np.zeros(n_items),
+            global_mean=ratings.global_mean,
+            user_ids=np.arange(n_users),
+            item_ids=np.arange(n_items),
+            rating_scale=(1, 5)
+        )
+
+        print(f"Entraînement en flux du modèle Collaborative (SVD) sur {len(ratings):,} ratings...")
+        for epoch in range(self.params['n_epochs']):
+            for users, items, block_ratings in ratings.blocks(block_size, rng):
+                sgd_epochs(
+                    scorer,
+                    users,
+                    items,
+                    block_ratings.astype(np.float64),
+                    n_epochs=1,
+                    lr=self.params['lr_all'],
+                    reg=self.params['reg_all'],
+                    batch_size=batch_size,
+                    random_state=rng
+                )
+            print(f"  Époque {epoch + 1}/{self.params['n_epochs']} terminée")
+
+        # Retri des tables par ID brut, comme les autres scorers
+        user_order = np.argsort(ratings.user_ids, kind='stable')
+        item_order = np.argsort(ratings.item_ids, kind='stable')
+        self.scorer = FactorScorer(
+            user_factors=scorer.user_factors[user_order],
+            item_factors=scorer.item_factors[item_order],
+            user_bias=scorer.user_bias[user_order],
+            item_bias=scorer.item_bias[item_order],
+            global_mean=scorer.global_mean,
+            user_ids=ratings.user_ids[user_order],
+            item_ids=ratings.item_ids[item_order],
+            rating_scale=scorer.rating_scale
+        )
+        self.ann_index = None
+        self.is_trained = True
+        print("Entraînement terminé")
+
     def predict(self, user_id: int, item_id: int) -> float:
         """
         Prédit la note qu'un utilisateur donnerait à un film
@@ -114,24 +303,157 @@ class CollaborativeModel:
         if not self.is_trained:
             raise ValueError("Le modèle doit être entraîné avant de faire des prédictions")
         
-        prediction = self.algo.predict(user_id, item_id)
-        return prediction.est
+        return float(self.predict_many([user_id], [item_id])[0])
+
+    def predict_many(self, user_ids, item_ids) -> np.ndarray:
+        """
+        Prédit les notes d'une liste de couples (utilisateur, film) en une passe
+        
+        Args:
+            user_ids: ID des utilisateurs
+            item_ids: ID des films (même longueur)
+            
+        Returns:
+            Vecteur des notes prédites (entre 1 et 5)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant de faire des prédictions")
+        
+        return self.scorer.predict_many(np.asarray(user_ids), np.asarray(item_ids))
+
+    def fold_in(self, user_id: int, item_ids, ratings):
+        """
+        Calcule les facteurs d'un utilisateur à partir de ses notes, sans réentraîner
+
+        Les facteurs films sont fixés : pu et bu sont la solution d'un problème
+        de moindres carrés régularisé (même objectif que l'entraînement), de
+        taille n_factors + 1. Le résultat remplace ou complète la table des
+        utilisateurs du scorer : un nouvel utilisateur est servi immédiatement.
+
+        Args:
+            user_id: ID de l'utilisateur (connu ou non du modèle)
+            item_ids: ID des films notés, tout l'historique de l'utilisateur
+                (les notes vues à l'entraînement ne sont pas conservées)
+            ratings: Notes associées
+
+        Returns:
+            Nombre de notes utilisées (films connus du modèle)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant le fold-in")
+
+        rows = self.scorer.item_indices(np.asarray(item_ids))
+        known = rows >= 0
+        rows = rows[known]
+        ratings = np.asarray(ratings, dtype=np.float64)[known]
+
+        Y = self.scorer.item_factors[rows].astype(np.float64)
+        n_factors = Y.shape[1]
+
+        if self.params['algorithm'] == 'als_implicit':
+            # (YᵀY + Yᵀ(C_u - I)Y + reg I) pu = Yᵀ C_u 1, sans biais
+            confidence = 1 + self.params['als_alpha'] * ratings
+            A = self._item_gram() + (Y * (confidence - 1)[:, None]).T @ Y
+            A += self.params['als_reg'] * np.eye(n_factors)
+            factors, bias = np.linalg.solve(A, Y.T @ confidence), 0.0
+        else:
+            # min sum (r - mu - bi - bu - <pu, qi>)² + reg * n_u * (||pu||² + bu²)
+            reg = self.params['reg_all'] if self.params['algorithm'] == 'svd' else self.params['als_reg']
+            X = np.hstack([Y, np.ones((len(rows), 1))])
+            targets = ratings - self.scorer.global_mean - self.scorer.item_bias[rows]
+            A = X.T @ X + reg * max(len(rows), 1) * np.eye(n_factors + 1)
+            solution = np.linalg.solve(A, X.T @ targets)
+            factors, bias = solution[:-1], solution[-1]
+
+        self.scorer.update_user(user_id, factors, bias)
+
+        return int(len(rows))
+
+    def _item_gram(self) -> np.ndarray:
+        """
+        Retourne QᵀQ (fold-in implicite), calculé une fois par scorer
+        """
+        cached_scorer, cached_gram = self._gram_cache
+        if cached_scorer is not self.scorer:
+            item_factors = self.scorer.item_factors.astype(np.float64)
+            cached_gram = item_factors.T @ item_factors
+            self._gram_cache = (self.scorer, cached_gram)
+
+        return cached_gram
+
+    def watch(self, interactions: InteractionStore):
+        """
+        Refait le fold-in d'un utilisateur à chaque modification de ses ratings
+        dans un InteractionStore (cf. InteractionStore.add_ratings)
+
+        À appeler avant RecommendationCache.watch : les facteurs sont alors à
+        jour quand les entrées en cache de l'utilisateur sont invalidées.
+        """
+        def refresh(user_id):
+            item_ids, ratings = interactions.user_ratings(user_id)
+            self.fold_in(user_id, item_ids, ratings)
+
+        interactions.subscribe(refresh)
+
+    def _catalog_rows(self, catalog: ItemCatalog) -> np.ndarray:
+        """
+        Retourne les index de lignes des facteurs pour chaque film du catalogue
+
+        La correspondance est calculée une fois par catalogue puis réutilisée.
+        """
+        cached_catalog, cached_scorer, cached_rows = self._catalog_cache
+        if cached_catalog is not catalog or cached_scorer is not self.scorer:
+            cached_rows = self.scorer.item_indices(catalog.item_ids)
+            self._catalog_cache = (catalog, self.scorer, cached_rows)
+
+        return cached_rows
+    
+    def score_catalog(
+        self,
+        user_id: int,
+        interactions: Union[InteractionStore, pd.DataFrame],
+        catalog: Union[ItemCatalog, pd.DataFrame]
+    ) -> np.ndarray:
+        """
+        Prédit la note de l'utilisateur pour chaque film du catalogue
+        
+        Args:
+            user_id: ID de l'utilisateur
+            interactions: Ratings (inutilisés, signature commune aux modèles)
+            catalog: Catalogue des films (ItemCatalog ou DataFrame)
+            
+        Returns:
+            Vecteur des notes prédites (une par film du catalogue, films vus inclus)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant de faire des recommandations")
+        
+        catalog = as_catalog(catalog)
+        
+        return self.scorer.score_items(user_id, self._catalog_rows(catalog))
     
     def recommend(
         self, 
         user_id: int, 
-        ratings_df: pd.DataFrame, 
-        movies_df: pd.DataFrame, 
-        n: int = 10
+        interactions: Union[InteractionStore, pd.DataFrame], 
+        catalog: Union[ItemCatalog, pd.DataFrame], 
+        n: int = 10,
+        approximate: bool = False,
+        n_probe: Optional[int] = None,
+        quantized: bool = True
     ) -> List[int]:
         """
         Génère les top N recommandations pour un utilisateur
         
         Args:
             user_id: ID de l'utilisateur
-            ratings_df: DataFrame des ratings (pour savoir quels films sont déjà vus)
-            movies_df: DataFrame des films (pour connaître tous les films disponibles)
+            interactions: Ratings, InteractionStore ou DataFrame (pour savoir quels films sont déjà vus)
+            catalog: Catalogue des films, ItemCatalog ou DataFrame (pour connaître tous les films disponibles)
             n: Nombre de recommandations
+            approximate: Ne scorer que les candidats de l'index ANN (cf. build_ann_index)
+            n_probe: Partitions explorées en mode approximatif (default : celui de l'index)
+            quantized: Utiliser les facteurs quantifiés s'ils existent (cf. quantize),
+                avec re-classement exact des meilleurs candidats
             
         Returns:
             Liste des item_id recommandés (ordonnée par score décroissant)
@@ -139,45 +461,469 @@ class CollaborativeModel:
         if not self.is_trained:
             raise ValueError("Le modèle doit être entraîné avant de faire des recommandations")
         
+        # Tous les films disponibles
+        catalog = as_catalog(catalog)
+        
         # Films déjà notés par l'utilisateur
-        user_ratings = ratings_df[ratings_df['user_id'] == user_id]
-        rated_items = user_ratings['item_id'].tolist()
+        interactions = as_interactions(interactions, user_ids=[user_id])
+        seen = interactions.seen_mask(user_id, catalog)
         
-        # Tous les films disponibles
-        all_items = movies_df['item_id'].tolist()
-        
-        # Films non notés
-        items_to_predict = [item for item in all_items if item not in rated_items]
-        
-        # Prédire les notes pour tous les films non notés
-        predictions = []
-        for item_id in items_to_predict:
-            pred = self.algo.predict(user_id, item_id)
-            predictions.append({
-                'item_id': item_id,
-                'score': pred.est
-            })
+        if approximate:
+            top = self._approximate_top(user_id, catalog, seen, n, n_probe)
+            if top is not None:
+                return catalog.item_ids[top].tolist()
         
-        # Trier par score décroissant et prendre le top N
-        predictions_df = pd.DataFrame(predictions)
-        predictions_df = predictions_df.sort_values('score', ascending=False).head(n)
+        if quantized and self.scorer.quantization is not None and self.scorer.user_index(user_id) >= 0:
+            top = self._quantized_top(user_id, catalog, seen, n)
+            return catalog.item_ids[top].tolist()
         
-        return predictions_df['item_id'].tolist()
-    
+        # Scorer tout le catalogue en un seul produit matrice-vecteur
+        scores = self.scorer.score_items(user_id, self._catalog_rows(catalog))
+        
+        # Masquer les films déjà notés et prendre le top N (tri partiel)
+        top = top_n_indices(scores, n, exclude=seen)
+        
+        return catalog.item_ids[top].tolist()
+
+    def build_ann_index(
+        self,
+        n_lists: Optional[int] = None,
+        n_iter: Optional[int] = None,
+        n_probe: Optional[int] = None
+    ) -> IVFIndex:
+        """
+        Construit l'index approximatif (IVF) sur les facteurs films
+
+        Args:
+            n_lists: Nombre de partitions (default depuis config)
+            n_iter: Nombre d'itérations de k-means (default depuis config)
+            n_probe: Partitions explorées par défaut (default depuis config)
+
+        Returns:
+            Instance de IVFIndex (également stockée dans self.ann_index)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant de construire l'index")
+
+        print("Construction de l'index ANN (IVF)...")
+        self.ann_index = IVFIndex.build(
+            self.scorer.item_factors,
+            self.scorer.item_bias,
+            n_lists=n_lists if n_lists is not None else ANN_CONFIG['n_lists'],
+            n_iter=n_iter if n_iter is not None else ANN_CONFIG['n_iter'],
+            n_probe=n_probe if n_probe is not None else ANN_CONFIG['n_probe'],
+            random_state=ANN_CONFIG['random_state']
+        )
+        print(f"Index construit : {self.ann_index.n_lists} partitions")
+
+        return self.ann_index
+
+    def _catalog_positions(self, catalog: ItemCatalog) -> np.ndarray:
+        """
+        Retourne la position catalogue de chaque ligne des facteurs films (-1 si hors catalogue)
+
+        Inverse de _catalog_rows, calculé une fois par catalogue puis réutilisé.
+        """
+        cached_catalog, cached_scorer, cached_positions = self._inverse_cache
+        if cached_catalog is not catalog or cached_scorer is not self.scorer:
+            item_rows = self._catalog_rows(catalog)
+            in_model = item_rows >= 0
+            cached_positions = np.full(len(self.scorer.item_ids), -1, dtype=np.intp)
+            cached_positions[item_rows[in_model]] = np.flatnonzero(in_model)
+            self._inverse_cache = (catalog, self.scorer, cached_positions)
+
+        return cached_positions
+
+    def _approximate_top(
+        self,
+        user_id: int,
+        catalog: ItemCatalog,
+        seen: np.ndarray,
+        n: int,
+        n_probe: Optional[int],
+        fallback: bool = True
+    ) -> Optional[np.ndarray]:
+        """
+        Top N parmi les candidats de l'index ANN
+
+        Args:
+            fallback: Retourner None quand il faut revenir au calcul exact ;
+                sinon, retourner les candidats trouvés même s'il y en a moins
+                de N (liste vide si l'utilisateur est inconnu)
+
+        Returns:
+            Positions catalogue des films recommandés, ou None s'il faut revenir
+            au calcul exact (utilisateur inconnu ou pas assez de candidats)
+        """
+        if self.ann_index is None:
+            raise ValueError("Aucun index ANN : appeler build_ann_index avant recommend(approximate=True)")
+
+        u = self.scorer.user_index(user_id)
+        if u < 0:
+            return None if fallback else np.empty(0, dtype=np.intp)
+
+        candidates = self.ann_index.candidates(self.scorer.user_factors[u], n_probe=n_probe)
+
+        # Candidats présents dans le catalogue, dans l'ordre du catalogue
+        # (départage des égalités identique au calcul exact)
+        positions = self._catalog_positions(catalog)[candidates]
+        positions = np.sort(positions[positions >= 0])
+        positions = positions[~seen[positions]]
+        if len(positions) < n and fallback:
+            return None
+
+        scores = self.scorer.score_items(user_id, self._catalog_rows(catalog)[positions])
+
+        return positions[top_n_indices(scores, n)]
+
+    def quantize(self, dtype: Optional[str] = None):
+        """
+        Construit la copie quantifiée des facteurs films utilisée par recommend
+
+        Args:
+            dtype: 'int8' ou 'float32' (default depuis config)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant d'être quantifié")
+
+        self.scorer.quantize(dtype or QUANTIZATION_CONFIG['dtype'] or 'int8')
+
+    def _quantized_top(
+        self,
+        user_id: int,
+        catalog: ItemCatalog,
+        seen: np.ndarray,
+        n: int
+    ) -> np.ndarray:
+        """
+        Top N : présélection sur les facteurs quantifiés puis re-classement exact
+
+        Returns:
+            Positions catalogue des films recommandés
+        """
+        item_rows = self._catalog_rows(catalog)
+
+        # Présélection de rerank_factor x N candidats sur les scores approchés
+        approximate = self.scorer.approximate_scores(user_id, item_rows)
+        n_candidates = max(n * QUANTIZATION_CONFIG['rerank_factor'], n)
+        candidates = np.sort(top_n_indices(approximate, n_candidates, exclude=seen))
+
+        # Scores exacts des seuls candidats (dans l'ordre du catalogue : même
+        # départage des égalités que le calcul exact)
+        scores = self.scorer.score_items(user_id, item_rows[candidates])
+
+        return candidates[top_n_indices(scores, n)]
+
+    def evaluate_quantization(
+        self,
+        user_ids: List[int],
+        interactions: Union[InteractionStore, pd.DataFrame],
+        catalog: Union[ItemCatalog, pd.DataFrame],
+        k: int = 10,
+        dtypes=('float32', 'int8')
+    ) -> pd.DataFrame:
+        """
+        Compare les recommandations issues des facteurs quantifiés à la pleine précision
+
+        Args:
+            user_ids: Utilisateurs sur lesquels mesurer
+            interactions: Ratings, InteractionStore ou DataFrame (films déjà vus)
+            catalog: Catalogue des films, ItemCatalog ou DataFrame
+            k: Nombre de recommandations comparées
+            dtypes: Types de quantification à tester
+
+        Returns:
+            DataFrame avec colonnes dtype, overlap@k (part du top k exact
+            retrouvée), latency_ms, item_factors_mb (mémoire des facteurs
+            films parcourus) et resident_mb (mémoire résidente totale des
+            facteurs films : la pleine précision reste chargée pour le
+            re-classement, sauf si elle est mappée, cf. load(mmap_mode='r'))
+        """
+        import time
+
+        catalog = as_catalog(catalog)
+        interactions = as_interactions(interactions, user_ids=user_ids)
+        current = (self.scorer.item_codes, self.scorer.item_scale)
+
+        try:
+            self.scorer.item_codes, self.scorer.item_scale = None, None
+
+            start = time.perf_counter()
+            exact = [self.recommend(u, interactions, catalog, n=k, quantized=False) for u in user_ids]
+            exact_latency = (time.perf_counter() - start) / max(len(user_ids), 1)
+
+            results = [{
+                'dtype': str(self.scorer.item_factors.dtype),
+                f'overlap@{k}': 1.0,
+                'latency_ms': exact_latency * 1000,
+                'item_factors_mb': self.scorer.item_factors.nbytes / 1e6,
+                'resident_mb': self.scorer.resident_item_bytes() / 1e6
+            }]
+
+            for dtype in dtypes:
+                self.scorer.quantize(dtype)
+
+                start = time.perf_counter()
+                approx = [self.recommend(u, interactions, catalog, n=k) for u in user_ids]
+                latency = (time.perf_counter() - start) / max(len(user_ids), 1)
+
+                overlaps = [
+                    len(set(a) & set(e)) / len(e)
+                    for a, e in zip(approx, exact) if e
+                ]
+                memory = self.scorer.item_codes.nbytes
+                if self.scorer.item_scale is not None:
+                    memory += self.scorer.item_scale.nbytes
+
+                results.append({
+                    'dtype': dtype,
+                    f'overlap@{k}': float(np.mean(overlaps)) if overlaps else 0.0,
+                    'latency_ms': latency * 1000,
+                    'item_factors_mb': memory / 1e6,
+                    'resident_mb': self.scorer.resident_item_bytes() / 1e6
+                })
+        finally:
+            self.scorer.item_codes, self.scorer.item_scale = current
+
+        return pd.DataFrame(results)
+
+    def evaluate_ann(
+        self,
+        user_ids: List[int],
+        interactions: Union[InteractionStore, pd.DataFrame],
+        catalog: Union[ItemCatalog, pd.DataFrame],
+        k: int = 10,
+        n_probes=(1, 2, 4, 8, 16)
+    ) -> pd.DataFrame:
+        """
+        Compare les recommandations approximatives aux recommandations exactes
+
+        Pour chaque valeur de n_probe : rappel@k (part du top k exact retrouvée)
+        et latence moyenne par utilisateur, à comparer à la latence exacte.
+        Le rappel mesure l'index seul, sans le repli sur le calcul exact de
+        recommend ; fallback_rate donne la part des utilisateurs pour qui
+        recommend(approximate=True) serait revenu au calcul exact (moins de k
+        candidats, ou utilisateur inconnu).
+
+        Args:
+            user_ids: Utilisateurs sur lesquels mesurer
+            interactions: Ratings, InteractionStore ou DataFrame (films déjà vus)
+            catalog: Catalogue des films, ItemCatalog ou DataFrame
+            k: Nombre de recommandations comparées
+            n_probes: Valeurs de n_probe à tester
+
+        Returns:
+            DataFrame avec colonnes n_probe, recall@k, fallback_rate, latency_ms
+            (n_probe = 0 pour la ligne du calcul exact)
+        """
+        import time
+
+        if self.ann_index is None:
+            raise ValueError("Aucun index ANN : appeler build_ann_index avant evaluate_ann")
+
+        catalog = as_catalog(catalog)
+        interactions = as_interactions(interactions, user_ids=user_ids)
+
+        start = time.perf_counter()
+        exact = [self.recommend(u, interactions, catalog, n=k) for u in user_ids]
+        exact_latency = (time.perf_counter() - start) / max(len(user_ids), 1)
+
+        results = [{'n_probe': 0, f'recall@{k}': 1.0, 'fallback_rate': 0.0, 'latency_ms': exact_latency * 1000}]
+        seen = [interactions.seen_mask(u, catalog) for u in user_ids]
+
+        for n_probe in n_probes:
+            start = time.perf_counter()
+            approx = [
+                self._approximate_top(u, catalog, user_seen, k, n_probe, fallback=False)
+                for u, user_seen in zip(user_ids, seen)
+            ]
+            latency = (time.perf_counter() - start) / max(len(user_ids), 1)
+
+            recalls = [
+                len(set(catalog.item_ids[a].tolist()) & set(e)) / len(e)
+                for a, e in zip(approx, exact) if e
+            ]
+            fallbacks = [len(a) < k for a in approx]
+            results.append({
+                'n_probe': n_probe,
+                f'recall@{k}': float(np.mean(recalls)) if recalls else 0.0,
+                'fallback_rate': float(np.mean(fallbacks)) if fallbacks else 0.0,
+                'latency_ms': latency * 1000
+            })
+
+        return pd.DataFrame(results)
+
+    def recommend_many(
+        self,
+        user_ids: List[int],
+        interactions: Union[InteractionStore, pd.DataFrame],
+        catalog: Union[ItemCatalog, pd.DataFrame],
+        n: int = 10,
+        block_size: int = 1024,
+        quantized: bool = True
+    ) -> np.ndarray:
+        """
+        Génère les top N recommandations pour un ensemble d'utilisateurs
+
+        Les utilisateurs sont scorés par blocs (produit facteurs utilisateurs x
+        facteurs films) : la mémoire crête reste bornée par block_size x nb films.
+        Mêmes listes que recommend : si le scorer est quantifié, les
+        utilisateurs connus passent par la présélection quantifiée et le
+        re-classement exact.
+
+        Args:
+            user_ids: Liste des ID utilisateurs
+            interactions: Ratings, InteractionStore ou DataFrame (pour savoir quels films sont déjà vus)
+            catalog: Catalogue des films, ItemCatalog ou DataFrame (pour connaître tous les films disponibles)
+            n: Nombre de recommandations par utilisateur
+            block_size: Nombre d'utilisateurs scorés à la fois
+            quantized: Utiliser les facteurs quantifiés s'ils existent (cf. recommend)
+
+        Returns:
+            Matrice (len(user_ids) x n) des item_id recommandés, ligne i pour
+            user_ids[i], complétée par -1 s'il y a moins de n films non vus
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant de faire des recommandations")
+
+        user_ids = np.asarray(user_ids)
+        catalog = as_catalog(catalog)
+        all_items = catalog.item_ids
+        item_rows = self._catalog_rows(catalog)
+
+        result = np.full((len(user_ids), n), -1, dtype=all_items.dtype)
+        if len(user_ids) == 0 or len(all_items) == 0:
+            return result
+
+        # Index partagé des films vus : lignes CSR de chaque utilisateur et
+        # position catalogue de chaque interaction
+        interactions = as_interactions(interactions, user_ids=user_ids)
+        user_rows = interactions.user_rows(user_ids)
+        seen_cols = interactions.catalog_rows(catalog)
+        indptr = interactions.indptr
+        use_quantized = quantized and self.scorer.quantization is not None
+
+        for start in range(0, len(user_ids), block_size):
+            stop = min(start + block_size, len(user_ids))
+            block_users = user_ids[start:stop]
+
+            # Masquer les films déjà notés de chaque utilisateur du bloc
+            block_rows = user_rows[start:stop]
+            known = block_rows >= 0
+            starts = np.where(known, indptr[np.maximum(block_rows, 0)], 0)
+            counts = np.where(known, indptr[np.maximum(block_rows, 0) + 1] - starts, 0)
+            rows = np.repeat(np.arange(stop - start), counts)
+            positions = (
+                np.arange(counts.sum())
+                - np.repeat(np.cumsum(counts) - counts, counts)
+                + np.repeat(starts, counts)
+            )
+            cols = seen_cols[positions]
+            in_catalog = cols >= 0
+            rows, cols = rows[in_catalog], cols[in_catalog]
+
+            # Utilisateurs connus : chemin quantifié ; les autres : calcul exact
+            users = self.scorer.user_indices(block_users) if use_quantized else None
+            quantized_rows = np.flatnonzero(users >= 0) if use_quantized else np.empty(0, dtype=np.intp)
+            exact_rows = np.setdiff1d(np.arange(stop - start), quantized_rows)
+
+            for subset, is_quantized in ((exact_rows, False), (quantized_rows, True)):
+                if len(subset) == 0:
+                    continue
+
+                # Films vus, renumérotés dans le sous-bloc
+                local = np.full(stop - start, -1)
+                local[subset] = np.arange(len(subset))
+                keep = local[rows] >= 0
+                seen = (local[rows][keep], cols[keep])
+
+                if is_quantized:
+                    top = self._quantized_top_rows(users[subset], item_rows, seen, n)
+                else:
+                    top = self._exact_top_rows(block_users[subset], item_rows, seen, n)
+                result[start + subset] = np.where(top >= 0, all_items[np.maximum(top, 0)], -1)
+
+        return result
+
+    def _exact_top_rows(self, user_ids, item_rows, seen, n: int) -> np.ndarray:
+        """
+        Top N exact d'un bloc d'utilisateurs
+
+        Args:
+            seen: Tuple (lignes du bloc, positions catalogue) des films déjà vus
+
+        Returns:
+            Matrice des positions catalogue (len(user_ids) x N), complétée par -1
+        """
+        scores = self.scorer.score_users(user_ids, item_rows)
+        scores[seen] = -np.inf
+
+        return top_n_rows(scores, n)
+
+    def _quantized_top_rows(self, users, item_rows, seen, n: int) -> np.ndarray:
+        """
+        Version par bloc de _quantized_top : présélection de rerank_factor x N
+        candidats sur les facteurs quantifiés, puis re-classement exact
+
+        Args:
+            users: Index de lignes des utilisateurs (connus du modèle)
+            seen: Tuple (lignes du bloc, positions catalogue) des films déjà vus
+
+        Returns:
+            Matrice des positions catalogue (len(users) x N), complétée par -1
+        """
+        scorer = self.scorer
+        approximate = scorer.approximate_score_users(users, item_rows)
+        approximate[seen] = -np.inf
+
+        # Candidats dans l'ordre du catalogue (même départage que le calcul exact)
+        n_candidates = max(n * QUANTIZATION_CONFIG['rerank_factor'], n)
+        candidates = top_n_rows(approximate, n_candidates)
+        candidates[candidates < 0] = len(item_rows)
+        candidates.sort(axis=1)
+        valid = candidates < len(item_rows)
+        candidates[~valid] = -1
+
+        # Scores exacts des seuls candidats (cf. score_items)
+        rows = np.where(valid, item_rows[np.maximum(candidates, 0)], -1)
+        known = rows >= 0
+        safe_rows = np.maximum(rows, 0)
+        dots = np.einsum('ij,ikj->ik', scorer.user_factors[users], scorer.item_factors[safe_rows])
+        scores = (
+            scorer.global_mean
+            + np.asarray(scorer.user_bias[users])[:, None]
+            + np.where(known, scorer.item_bias[safe_rows] + dots, 0.0)
+        )
+        if scorer.rating_scale is not None:
+            np.clip(scores, scorer.rating_scale[0], scorer.rating_scale[1], out=scores)
+        scores[~valid] = -np.inf
+
+        top = top_n_rows(scores, n)
+
+        return np.where(top >= 0, np.take_along_axis(candidates, np.maximum(top, 0), axis=1), -1)
+
     def save(self, filepath: str):
         """
-        Sauvegarde le modèle entraîné
+        Sauvegarde le modèle entraîné sous forme d'artefact compact
+        
+        Le répertoire contient les facteurs, les biais et les ID triés en .npy
+        ainsi qu'un manifeste JSON (le trainset Surprise n'est pas sauvegardé),
+        et l'index ANN s'il existe (signalé dans le manifeste).
         
         Args:
-            filepath: Chemin où sauvegarder le modèle
+            filepath: Répertoire où sauvegarder le modèle
         """
         if not self.is_trained:
             raise ValueError("Le modèle doit être entraîné avant d'être sauvegardé")
         
-        import pickle
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(self.algo, f)
+        # Facteurs et index ANN remplacent l'ancien artefact en une fois
+        with atomic_directory(filepath) as target:
+            self.scorer.save(target, metadata={
+                'params': self.params,
+                'ann_index': self.ann_index is not None
+            })
+            if self.ann_index is not None:
+                self.ann_index.save(target)
         
         print(f"Modèle sauvegardé : {filepath}")
     
@@ -210,16 +956,34 @@ class CollaborativeModel:
             # model.recommend(...)  # Prêt à utiliser
             # model.recommend(...)  # Prêt à utiliser
     @classmethod
-    def load(cls , file_path):
+    def load(cls , file_path, mmap_mode: Optional[str] = None):
         """
         Charge un modèle sauvegardé
         
+        Accepte un répertoire d'artefact (format actuel) ou un pickle de SVD
+        Surprise (ancien format).
+        
         Args:
             filepath: Chemin du modèle sauvegardé
+            mmap_mode: Mode mmap des tableaux ('r' pour partager les pages
+                entre processus), ignoré pour l'ancien format
             
         Returns:
             Instance de CollaborativeModel avec le modèle chargé
         """
+        if is_artifact(file_path):
+            scorer, manifest = FactorScorer.load(file_path, mmap_mode=mmap_mode)
+            
+            instance = cls(**manifest['metadata'].get('params', {}))
+            instance.scorer = scorer
+            # Index ANN relu seulement s'il a été sauvegardé avec ces facteurs
+            if manifest['metadata'].get('ann_index'):
+                instance.ann_index = IVFIndex.load(file_path)
+            instance.is_trained = True
+            
+            return instance
+        
+        # Ancien format : pickle du SVD Surprise complet
         import pickle
         
         with open(file_path , 'rb') as f:
@@ -227,6 +991,7 @@ class CollaborativeModel:
         
         instance = cls()
         instance.algo = algo
+        instance.scorer = FactorScorer.from_surprise(algo)
         instance.is_trained = True
         
         return instance 
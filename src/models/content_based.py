@@ -5,8 +5,13 @@ import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import List
+from sklearn.preprocessing import normalize
+from typing import List, Union
 
+from .neighbors import NeighborTable
+from ..data.catalog import ItemCatalog, as_catalog
+from ..data.interactions import InteractionStore, as_interactions
+from ..utils.ranking import top_n_indices
 from ..config import CONTENT_CONFIG
 
 
@@ -20,7 +25,8 @@ class ContentBasedModel:
         Initialise le modèle Content-Based
         
         Args:
-            **kwargs: Paramètres pour TF-IDF
+            **kwargs: Paramètres pour TF-IDF et le mode de similarité
+                (similarity, n_neighbors, chunk_size, neighbor_dtype)
         """
         # Fusionner les paramètres par défaut avec ceux fournis
         params = {**CONTENT_CONFIG, **kwargs}
@@ -31,24 +37,56 @@ class ContentBasedModel:
         )
         
         self.min_rating = params['min_rating']
+        
+        if params['similarity'] not in ('dense', 'neighbors', 'profile'):
+            raise ValueError(f"Mode de similarité inconnu : {params['similarity']}")
+        
+        self.similarity = params['similarity']
+        self.n_neighbors = params['n_neighbors']
+        self.chunk_size = params['chunk_size']
+        self.neighbor_dtype = np.dtype(params['neighbor_dtype'])
+        
         self.cosine_sim = None
+        self.neighbors = None
+        self.tfidf_matrix = None
         self.is_trained = False
         
-    def fit(self, movies_df: pd.DataFrame):
+    def fit(self, catalog: Union[ItemCatalog, pd.DataFrame]):
         """
         Entraîne le modèle en calculant la matrice de similarité
         
         Args:
-            movies_df: DataFrame avec colonnes item_id, genres
+            catalog: Catalogue des films (ItemCatalog ou DataFrame avec colonnes item_id, genres)
         """
         print("Entraînement du modèle Content-Based...")
         
+        catalog = as_catalog(catalog)
+        
         # Vérifier que la colonne genres existe
-        if 'genres' not in movies_df.columns:
+        if catalog.genres is None:
             raise ValueError("Le DataFrame doit contenir une colonne 'genres'")
         
         # Créer la matrice TF-IDF
-        tfidf_matrix = self.tfidf.fit_transform(movies_df['genres'])
+        tfidf_matrix = self.tfidf.fit_transform(catalog.genres)
+        
+        if self.similarity == 'profile':
+            # Seule la matrice TF-IDF normalisée (L2) est conservée
+            self.tfidf_matrix = normalize(tfidf_matrix, norm='l2', copy=False).tocsr()
+            self.is_trained = True
+            print(f"Entraînement terminé - Matrice TF-IDF : {self.tfidf_matrix.shape}")
+            return
+        
+        if self.similarity == 'neighbors':
+            # Top-K voisins par film, calculés par blocs de lignes
+            self.neighbors = NeighborTable.from_matrix(
+                tfidf_matrix,
+                n_neighbors=self.n_neighbors,
+                chunk_size=self.chunk_size,
+                dtype=self.neighbor_dtype
+            )
+            self.is_trained = True
+            print(f"Entraînement terminé - Table de voisins : {self.neighbors.shape}")
+            return
         
         # Calculer la matrice de similarité cosine
         self.cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
@@ -60,7 +98,7 @@ class ContentBasedModel:
     def get_similar_items(
         self, 
         item_id: int, 
-        movies_df: pd.DataFrame, 
+        catalog: Union[ItemCatalog, pd.DataFrame], 
         n: int = 10
     ) -> List[int]:
         """
@@ -68,7 +106,7 @@ class ContentBasedModel:
         
         Args:
             item_id: ID du film
-            movies_df: DataFrame des films
+            catalog: Catalogue des films (ItemCatalog ou DataFrame)
             n: Nombre de films similaires à retourner
             
         Returns:
@@ -77,33 +115,36 @@ class ContentBasedModel:
         if not self.is_trained:
             raise ValueError("Le modèle doit être entraîné avant de trouver des films similaires")
         
-        # Trouver l'index du film
-        try:
-            idx = movies_df[movies_df['item_id'] == item_id].index[0]
-        except IndexError:
-            raise ValueError(f"Film avec item_id={item_id} introuvable")
+        catalog = as_catalog(catalog)
         
-        # Récupérer les scores de similarité
-        sim_scores = list(enumerate(self.cosine_sim[idx]))
+        # Trouver la position du film
+        idx = catalog.row(item_id)
+        if idx < 0:
+            raise ValueError(f"Film avec item_id={item_id} introuvable")
         
-        # Trier par similarité décroissante
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+        if self.similarity == 'neighbors':
+            similar_indices = self.neighbors.neighbors(idx, n)
+            return catalog.item_ids[similar_indices].tolist()
         
-        # Prendre les N films les plus similaires (en excluant le film lui-même)
-        sim_scores = sim_scores[1:n+1]
+        if self.similarity == 'profile':
+            scores = self._profile_scores(np.array([idx]))
+            exclude = np.zeros(len(scores), dtype=bool)
+            exclude[idx] = True
+            similar_indices = top_n_indices(scores, n, exclude=exclude)
+            return catalog.item_ids[similar_indices].tolist()
         
-        # Récupérer les item_id
-        similar_indices = [i[0] for i in sim_scores]
-        similar_items = movies_df.iloc[similar_indices]['item_id'].tolist()
+        # Trier par similarité décroissante et prendre les N films suivant le
+        # premier (le film lui-même)
+        similar_indices = top_n_indices(self.cosine_sim[idx], n + 1)[1:]
         
-        return similar_items
+        return catalog.item_ids[similar_indices].tolist()
     
     
     def recommend(
         self, 
         user_id: int, 
-        ratings_df: pd.DataFrame, 
-        movies_df: pd.DataFrame, 
+        interactions: Union[InteractionStore, pd.DataFrame], 
+        catalog: Union[ItemCatalog, pd.DataFrame], 
         n: int = 10
     ) -> List[int]:
         """
@@ -111,8 +152,8 @@ class ContentBasedModel:
         
         Args:
             user_id: ID de l'utilisateur
-            ratings_df: DataFrame des ratings
-            movies_df: DataFrame des films
+            interactions: Ratings (InteractionStore ou DataFrame)
+            catalog: Catalogue des films (ItemCatalog ou DataFrame)
             n: Nombre de recommandations
             
         Returns:
@@ -121,43 +162,86 @@ class ContentBasedModel:
         if not self.is_trained:
             raise ValueError("Le modèle doit être entraîné avant de faire des recommandations")
         
+        catalog = as_catalog(catalog)
+        interactions = as_interactions(interactions, user_ids=[user_id])
+        
         # Films aimés par l'utilisateur
-        user_ratings = ratings_df[ratings_df['user_id'] == user_id]
-        liked_films = user_ratings[user_ratings['rating'] >= self.min_rating]
+        liked_films = interactions.liked_items(user_id, self.min_rating)
         
-        # Films déjà vus
-        seen_items = user_ratings['item_id'].tolist()
+        # Positions des films aimés dans le catalogue (en une seule passe)
+        liked_rows = catalog.rows(liked_films)
+        liked_rows = liked_rows[liked_rows >= 0]
         
-        # Dictionnaire pour accumuler les scores
-        recommendation_scores = {}
+        if len(liked_rows) == 0:
+            return []
         
-        # Pour chaque film aimé
-        for _, row in liked_films.iterrows():
-            item_id = row['item_id']
-            
-            # Trouver l'index du film
-            try:
-                idx = movies_df[movies_df['item_id'] == item_id].index[0]
-            except IndexError:
-                continue
+        # Somme des similarités des films aimés
+        scores = self._liked_scores(liked_rows, len(catalog))
+        
+        # Masquer les films déjà vus et prendre le top N (tri partiel)
+        top = top_n_indices(scores, n, exclude=interactions.seen_mask(user_id, catalog))
+        
+        return catalog.item_ids[top].tolist()
+    
+    def score_catalog(
+        self,
+        user_id: int,
+        interactions: Union[InteractionStore, pd.DataFrame],
+        catalog: Union[ItemCatalog, pd.DataFrame]
+    ) -> np.ndarray:
+        """
+        Somme, pour chaque film du catalogue, sa similarité avec les films aimés
+        
+        Args:
+            user_id: ID de l'utilisateur
+            interactions: Ratings (InteractionStore ou DataFrame)
+            catalog: Catalogue des films (ItemCatalog ou DataFrame)
             
-            # Récupérer les similarités
-            sim_scores = list(enumerate(self.cosine_sim[idx]))
+        Returns:
+            Vecteur de scores (un par film du catalogue, films vus inclus),
+            nul si l'utilisateur n'a aimé aucun film du catalogue
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle doit être entraîné avant de faire des recommandations")
+        
+        catalog = as_catalog(catalog)
+        interactions = as_interactions(interactions, user_ids=[user_id])
+        
+        liked_rows = catalog.rows(interactions.liked_items(user_id, self.min_rating))
+        liked_rows = liked_rows[liked_rows >= 0]
+        
+        return self._liked_scores(liked_rows, len(catalog))
+    
+    def _liked_scores(self, liked_rows: np.ndarray, n_items: int) -> np.ndarray:
+        """
+        Somme les similarités des films aimés selon le mode de similarité
+        """
+        if len(liked_rows) == 0:
+            return np.zeros(n_items)
+        
+        if self.similarity == 'neighbors':
+            return self.neighbors.accumulate(liked_rows, n_items)
+        if self.similarity == 'profile':
+            return self._profile_scores(liked_rows)
+        
+        return self.cosine_sim[liked_rows].sum(axis=0)
+    
+    def _profile_scores(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Score le catalogue à partir du profil TF-IDF d'un ensemble de films
+        
+        Le profil est la somme des lignes TF-IDF normalisées des films : son
+        produit avec la matrice donne la somme de leurs similarités cosine.
+        
+        Args:
+            rows: Positions des films dans le catalogue (ex : films aimés)
             
-            # Accumuler les scores
-            for film_idx, sim_score in sim_scores:
-                film_id = movies_df.iloc[film_idx]['item_id']
-                
-                if film_id not in seen_items:
-                    if film_id not in recommendation_scores:
-                        recommendation_scores[film_id] = 0
-                    recommendation_scores[film_id] += sim_score
-        
-        # Trier par score décroissant et prendre le top N
-        sorted_recs = sorted(recommendation_scores.items(), key=lambda x: x[1], reverse=True)
-        top_items = [item[0] for item in sorted_recs[:n]]
-        
-        return top_items
+        Returns:
+            Vecteur de scores (un par film du catalogue)
+        """
+        profile = np.asarray(self.tfidf_matrix[rows].sum(axis=0)).ravel()
+        
+        return self.tfidf_matrix @ profile
     
     def save(self, filepath: str):
         """
@@ -174,7 +258,11 @@ class ContentBasedModel:
         model_data = {
             'tfidf': self.tfidf,
             'cosine_sim': self.cosine_sim,
-            'min_rating': self.min_rating
+            'min_rating': self.min_rating,
+            'similarity': self.similarity,
+            'tfidf_matrix': self.tfidf_matrix,
+            'neighbor_indices': self.neighbors.indices if self.neighbors is not None else None,
+            'neighbor_scores': self.neighbors.scores if self.neighbors is not None else None
         }
         
         with open(filepath, 'wb') as f:
@@ -203,6 +291,18 @@ class ContentBasedModel:
         instance.tfidf = model_data['tfidf']
         instance.cosine_sim = model_data['cosine_sim']
         instance.min_rating = model_data['min_rating']
+        instance.similarity = model_data.get('similarity', 'dense')
+        
+        if instance.similarity == 'neighbors':
+            instance.neighbors = NeighborTable(
+                model_data['neighbor_indices'],
+                model_data['neighbor_scores']
+            )
+            instance.n_neighbors = instance.neighbors.shape[1]
+        
+        if instance.similarity == 'profile':
+            instance.tfidf_matrix = model_data['tfidf_matrix']
+        
         instance.is_trained = True
         
         print(f"Modèle chargé : {filepath}")
@@ -1,12 +1,21 @@
 """
 Modèle Hybrid combinant Collaborative et Content-Based Filtering
 """
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Optional, Tuple, Union
 
 from .collaborative import CollaborativeModel
 from .content_based import ContentBasedModel
-from ..utils.preprocessing import normalize_scores
+from ..data.catalog import ItemCatalog, as_catalog
+from ..data.interactions import InteractionStore, as_interactions
+from ..utils.preprocessing import normalize_score_vector
+from ..utils.ranking import top_n_indices
 from ..config import HYBRID_CONFIG
 
 
@@ -19,7 +28,11 @@ class HybridModel:
         self, 
         collaborative_model: CollaborativeModel,
         content_model: ContentBasedModel,
-        alpha: float = None
+        alpha: float = None,
+        fusion: str = None,
+        normalization: str = None,
+        execution: str = None,
+        timeout: Optional[float] = None
     ):
         """
         Initialise le modèle Hybrid
@@ -28,6 +41,13 @@ class HybridModel:
             collaborative_model: Instance du modèle Collaborative
             content_model: Instance du modèle Content-Based
             alpha: Poids du Collaborative (default depuis config)
+            fusion: 'rank' (rangs des top 50 de chaque modèle) ou 'score'
+                (scores normalisés sur tout le catalogue), default depuis config
+            normalization: 'minmax' ou 'zscore' pour la fusion 'score' (default depuis config)
+            execution: 'sequential' ou 'threads' pour exécuter les deux modèles
+                en parallèle (default depuis config)
+            timeout: Délai max en secondes accordé à chaque modèle en mode
+                'threads' (default depuis config, None = pas de limite)
         """
         self.collaborative_model = collaborative_model
         self.content_model = content_model
@@ -36,6 +56,20 @@ class HybridModel:
         self.alpha = alpha if alpha is not None else HYBRID_CONFIG['alpha']
         self.beta = 1.0 - self.alpha
         
+        self.fusion = fusion if fusion is not None else HYBRID_CONFIG['fusion']
+        self.normalization = (
+            normalization if normalization is not None else HYBRID_CONFIG['normalization']
+        )
+        
+        if self.fusion not in ('rank', 'score'):
+            raise ValueError(f"Mode de fusion inconnu : {self.fusion}")
+        
+        self.execution = execution if execution is not None else HYBRID_CONFIG['execution']
+        self.timeout = timeout if timeout is not None else HYBRID_CONFIG['timeout']
+        
+        if self.execution not in ('sequential', 'threads'):
+            raise ValueError(f"Mode d'exécution inconnu : {self.execution}")
+        
         # Vérifier que les modèles sont entraînés
         if not self.collaborative_model.is_trained:
             raise ValueError("Le modèle Collaborative doit être entraîné")
@@ -46,8 +80,8 @@ class HybridModel:
     def recommend(
         self, 
         user_id: int, 
-        ratings_df: pd.DataFrame, 
-        movies_df: pd.DataFrame, 
+        interactions: Union[InteractionStore, pd.DataFrame], 
+        catalog: Union[ItemCatalog, pd.DataFrame], 
         n: int = 10
     ) -> List[int]:
         """
@@ -55,21 +89,31 @@ class HybridModel:
         
         Args:
             user_id: ID de l'utilisateur
-            ratings_df: DataFrame des ratings
-            movies_df: DataFrame des films
+            interactions: Ratings (InteractionStore ou DataFrame)
+            catalog: Catalogue des films (ItemCatalog ou DataFrame)
             n: Nombre de recommandations
             
         Returns:
             Liste des item_id recommandés (ordonnée par score hybride décroissant)
         """
+        # Construire le catalogue et l'index des ratings une seule fois pour les deux modèles
+        catalog = as_catalog(catalog)
+        interactions = as_interactions(interactions, user_ids=[user_id])
+        
+        if self.fusion == 'score':
+            return self._recommend_by_score(user_id, interactions, catalog, n)
+        
         # Obtenir les recommandations des deux modèles (top 50 pour avoir du choix)
-        collab_items = self.collaborative_model.recommend(
-            user_id, ratings_df, movies_df, n=50
-        )
-        content_items = self.content_model.recommend(
-            user_id, ratings_df, movies_df, n=50
+        collab_items, content_items = self._run_sources(
+            self.collaborative_model.recommend,
+            self.content_model.recommend,
+            user_id, interactions, catalog, n=50
         )
         
+        # Un modèle hors délai ne contribue pas
+        collab_items = collab_items if collab_items is not None else []
+        content_items = content_items if content_items is not None else []
+        
         # Créer des scores pour chaque approche (basé sur le rang)
         hybrid_scores = {}
         
@@ -90,6 +134,79 @@ class HybridModel:
         
         return top_items
     
+    def _recommend_by_score(
+        self,
+        user_id: int,
+        interactions: InteractionStore,
+        catalog: ItemCatalog,
+        n: int
+    ) -> List[int]:
+        """
+        Fusionne les scores des deux modèles sur tout le catalogue
+        
+        Les scores de chaque modèle sont normalisés sur les films non vus puis
+        combinés avec alpha / beta, suivi d'une seule sélection du top N.
+        """
+        collab_scores, content_scores = self._run_sources(
+            self.collaborative_model.score_catalog,
+            self.content_model.score_catalog,
+            user_id, interactions, catalog
+        )
+        
+        seen = interactions.seen_mask(user_id, catalog)
+        candidates = ~seen
+        
+        # Un modèle hors délai ne contribue pas
+        hybrid_scores = np.zeros(len(catalog))
+        if collab_scores is not None:
+            hybrid_scores[candidates] += self.alpha * normalize_score_vector(
+                collab_scores[candidates], self.normalization
+            )
+        if content_scores is not None:
+            hybrid_scores[candidates] += self.beta * normalize_score_vector(
+                content_scores[candidates], self.normalization
+            )
+        
+        top = top_n_indices(hybrid_scores, n, exclude=seen)
+        
+        return catalog.item_ids[top].tolist()
+    
+    def _run_sources(self, collab_fn, content_fn, *args, **kwargs) -> Tuple:
+        """
+        Exécute les deux modèles, l'un après l'autre ou en parallèle
+        
+        En mode 'threads', chaque modèle tourne dans un thread dédié à la
+        requête et les deux disposent du même délai de self.timeout secondes.
+        Un modèle hors délai est remplacé par None ; son thread finit seul
+        sans bloquer les requêtes suivantes. Si les deux sont hors délai,
+        TimeoutError est levée.
+        
+        Returns:
+            Tuple (résultat Collaborative, résultat Content-Based)
+        """
+        if self.execution == 'sequential':
+            return collab_fn(*args, **kwargs), content_fn(*args, **kwargs)
+        
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        futures = {
+            'Collaborative': _run_in_thread(collab_fn, *args, **kwargs),
+            'Content-Based': _run_in_thread(content_fn, *args, **kwargs)
+        }
+        
+        results = {}
+        for name, future in futures.items():
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                print(f"Modèle {name} hors délai ({self.timeout}s), ignoré")
+                results[name] = None
+        
+        if all(result is None for result in results.values()):
+            raise TimeoutError("Aucun modèle n'a répondu dans le délai imparti")
+        
+        return results['Collaborative'], results['Content-Based']
+    
     def save(self, filepath: str):
         """
         Sauvegarde la configuration du modèle hybrid
@@ -101,7 +218,11 @@ class HybridModel:
         
         config = {
             'alpha': self.alpha,
-            'beta': self.beta
+            'beta': self.beta,
+            'fusion': self.fusion,
+            'normalization': self.normalization,
+            'execution': self.execution,
+            'timeout': self.timeout
         }
         
         with open(filepath, 'wb') as f:
@@ -136,9 +257,34 @@ class HybridModel:
         instance = cls(
             collaborative_model=collaborative_model,
             content_model=content_model,
-            alpha=config['alpha']
+            alpha=config['alpha'],
+            fusion=config.get('fusion'),
+            normalization=config.get('normalization'),
+            execution=config.get('execution'),
+            timeout=config.get('timeout')
         )
         
         print(f"Configuration Hybrid chargée : {filepath}")
         
-        return instance
\ No newline at end of file
+        return instance
+
+
+def _run_in_thread(fn, *args, **kwargs) -> Future:
+    """
+    Lance fn dans un thread daemon dédié et retourne son Future
+
+    Aucun pool partagé : un appel hors délai ne retient aucun worker.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name='hybrid-source', daemon=True).start()
+
+    return future
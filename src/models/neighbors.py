@@ -0,0 +1,106 @@
+"""
+Table des K plus proches voisins (similarité cosine) entre films
+"""
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from ..utils.ranking import top_n_rows
+
+
+class NeighborTable:
+    """
+    Table à largeur fixe des K voisins les plus similaires de chaque film
+
+    Remplace la matrice de similarité dense N x N : mémoire en O(N * K).
+    La ligne i contient les index (positions catalogue) des voisins du film i,
+    triés par similarité décroissante, complétés par -1.
+    """
+
+    def __init__(self, indices: np.ndarray, scores: np.ndarray):
+        """
+        Initialise la table
+
+        Args:
+            indices: Index des voisins (n_items x K), -1 si absent
+            scores: Similarités associées (n_items x K)
+        """
+        self.indices = indices
+        self.scores = scores
+
+    @property
+    def shape(self):
+        return self.indices.shape
+
+    @classmethod
+    def from_matrix(
+        cls,
+        feature_matrix,
+        n_neighbors: int = 50,
+        chunk_size: int = 1024,
+        dtype=np.float32
+    ):
+        """
+        Calcule la table par blocs de lignes à partir d'une matrice de features
+
+        Seul un bloc chunk_size x N de similarités est matérialisé à la fois.
+
+        Args:
+            feature_matrix: Matrice (creuse) des features des films, ex : TF-IDF
+            n_neighbors: Nombre de voisins conservés par film (K)
+            chunk_size: Nombre de lignes traitées par bloc
+            dtype: Type des similarités stockées (float32 ou float16)
+
+        Returns:
+            Instance de NeighborTable
+        """
+        n_items = feature_matrix.shape[0]
+        indices = np.full((n_items, n_neighbors), -1, dtype=np.int32)
+        scores = np.zeros((n_items, n_neighbors), dtype=dtype)
+
+        for start in range(0, n_items, chunk_size):
+            stop = min(start + chunk_size, n_items)
+            sim = cosine_similarity(feature_matrix[start:stop], feature_matrix)
+
+            # Un film n'est pas son propre voisin
+            rows = np.arange(stop - start)
+            sim[rows, rows + start] = -np.inf
+
+            top = top_n_rows(sim, n_neighbors)
+            valid = top >= 0
+            indices[start:stop] = top
+            scores[start:stop] = np.where(
+                valid, np.take_along_axis(sim, np.maximum(top, 0), axis=1), 0
+            )
+
+        return cls(indices, scores)
+
+    def neighbors(self, row: int, n: int) -> np.ndarray:
+        """
+        Retourne les positions des N voisins les plus similaires d'un film
+
+        Args:
+            row: Position du film dans le catalogue
+            n: Nombre de voisins
+
+        Returns:
+            Tableau des positions (au plus min(N, K))
+        """
+        neighbors = self.indices[row, :n]
+        return neighbors[neighbors >= 0]
+
+    def accumulate(self, rows: np.ndarray, n_items: int) -> np.ndarray:
+        """
+        Somme les similarités des voisins d'un ensemble de films
+
+        Args:
+            rows: Positions des films (ex : films aimés par un utilisateur)
+            n_items: Taille du catalogue
+
+        Returns:
+            Vecteur de scores (n_items), 0 pour les films hors des voisinages
+        """
+        neighbors = self.indices[rows].ravel()
+        weights = self.scores[rows].ravel().astype(np.float64)
+        valid = neighbors >= 0
+
+        return np.bincount(neighbors[valid], weights=weights[valid], minlength=n_items)
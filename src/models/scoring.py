@@ -0,0 +1,628 @@
+"""
+Moteur de scoring vectorisé basé sur les facteurs latents d'un modèle SVD
+"""
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+ARTIFACT_FORMAT = 'factor_scorer'
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+ARTIFACT_ARRAYS = (
+    'user_factors', 'item_factors', 'user_bias', 'item_bias', 'user_ids', 'item_ids'
+)
+QUANTIZED_ARRAYS = ('item_codes', 'item_scale')
+QUANTIZED_DTYPES = ('float32', 'int8')
+
+
+class FactorScorer:
+    """
+    Calcule les notes prédites mu + bu + bi + <pu, qi> pour tout le catalogue
+    en un seul produit matrice-vecteur
+
+    Les identifiants bruts sont stockés triés, les lignes des facteurs suivent
+    le même ordre : la conversion id -> index se fait par recherche dichotomique.
+    Les utilisateurs ajoutés après l'entraînement (cf. update_user) sont
+    rangés à la suite, dans une table extensible indexée par un dict.
+    """
+
+    def __init__(
+        self,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_bias: np.ndarray,
+        item_bias: np.ndarray,
+        global_mean: float,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        rating_scale: Optional[Tuple[float, float]] = (1, 5)
+    ):
+        """
+        Initialise le moteur de scoring
+
+        Args:
+            user_factors: Facteurs utilisateurs pu (n_users x n_factors)
+            item_factors: Facteurs films qi (n_items x n_factors)
+            user_bias: Biais utilisateurs bu (n_users)
+            item_bias: Biais films bi (n_items)
+            global_mean: Moyenne globale des notes
+            user_ids: ID bruts des utilisateurs, triés (ligne i <-> user_ids[i])
+            item_ids: ID bruts des films, triés (ligne i <-> item_ids[i])
+            rating_scale: Bornes (min, max) pour écrêter les notes, None pour ne pas écrêter
+        """
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_bias = user_bias
+        self.item_bias = item_bias
+        self.global_mean = float(global_mean)
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.rating_scale = tuple(rating_scale) if rating_scale is not None else None
+
+        # Utilisateurs ajoutés après l'entraînement : ID -> ligne (>= len(user_ids))
+        self._extra_users = {}
+        self._n_user_rows = len(user_ids)
+
+        # Copie quantifiée des facteurs films (cf. quantize)
+        self.item_codes = None
+        self.item_scale = None
+
+    @classmethod
+    def from_surprise(cls, algo):
+        """
+        Construit le moteur à partir d'un SVD Surprise entraîné
+
+        Args:
+            algo: Instance de surprise.SVD entraînée
+
+        Returns:
+            Instance de FactorScorer
+        """
+        trainset = algo.trainset
+
+        # ID bruts dans l'ordre des index internes de Surprise
+        raw_users = np.array([trainset.to_raw_uid(u) for u in range(trainset.n_users)])
+        raw_items = np.array([trainset.to_raw_iid(i) for i in range(trainset.n_items)])
+
+        # Réordonner les lignes selon les ID triés
+        user_order = np.argsort(raw_users, kind='stable')
+        item_order = np.argsort(raw_items, kind='stable')
+
+        return cls(
+            user_factors=algo.pu[user_order],
+            item_factors=algo.qi[item_order],
+            user_bias=algo.bu[user_order],
+            item_bias=algo.bi[item_order],
+            global_mean=trainset.global_mean,
+            user_ids=raw_users[user_order],
+            item_ids=raw_items[item_order],
+            rating_scale=trainset.rating_scale
+        )
+
+    @staticmethod
+    def _lookup(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """
+        Convertit des ID bruts en index de lignes (-1 si inconnu)
+        """
+        ids = np.asarray(ids)
+        if len(sorted_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.intp)
+
+        # ID contigus 0..n-1 (cf. load_data(index_ids=True)) : l'ID est la ligne
+        if (
+            np.issubdtype(sorted_ids.dtype, np.integer) and np.issubdtype(ids.dtype, np.integer)
+            and sorted_ids[0] == 0 and sorted_ids[-1] == len(sorted_ids) - 1
+        ):
+            return np.where((ids >= 0) & (ids < len(sorted_ids)), ids, -1).astype(np.intp)
+
+        positions = np.searchsorted(sorted_ids, ids)
+        positions = np.minimum(positions, len(sorted_ids) - 1)
+        found = sorted_ids[positions] == ids
+
+        return np.where(found, positions, -1)
+
+    def user_index(self, user_id) -> int:
+        """
+        Retourne l'index de ligne d'un utilisateur (-1 si inconnu)
+        """
+        u = int(self._lookup(self.user_ids, np.array([user_id]))[0])
+        if u < 0 and self._extra_users:
+            return self._extra_users.get(user_id, -1)
+
+        return u
+
+    def user_indices(self, user_ids: np.ndarray) -> np.ndarray:
+        """
+        Retourne les index de lignes d'un ensemble d'utilisateurs (-1 si inconnu)
+        """
+        users = self._lookup(self.user_ids, user_ids)
+        if self._extra_users:
+            missing = np.flatnonzero(users < 0)
+            users[missing] = [self._extra_users.get(uid, -1) for uid in np.asarray(user_ids)[missing].tolist()]
+
+        return users
+
+    def update_user(self, user_id, factors: np.ndarray, bias: float = 0.0):
+        """
+        Remplace (ou ajoute) les facteurs et le biais d'un utilisateur
+
+        Un utilisateur inconnu est ajouté à la suite de la table, dont la
+        capacité double quand elle est pleine. Des tableaux en lecture seule
+        (chargés en mmap) sont d'abord copiés en mémoire.
+
+        Args:
+            user_id: ID brut de l'utilisateur
+            factors: Nouveaux facteurs pu (n_factors)
+            bias: Nouveau biais bu
+        """
+        if not self.user_factors.flags.writeable or not self.user_bias.flags.writeable:
+            self.user_factors = np.array(self.user_factors)
+            self.user_bias = np.array(self.user_bias)
+
+        u = self.user_index(user_id)
+        if u < 0:
+            u = self._n_user_rows
+            if u >= len(self.user_factors):
+                capacity = max(2 * len(self.user_factors), 16)
+                user_factors = np.zeros((capacity, self.user_factors.shape[1]), dtype=self.user_factors.dtype)
+                user_factors[:u] = self.user_factors[:u]
+                user_bias = np.zeros(capacity, dtype=self.user_bias.dtype)
+                user_bias[:u] = self.user_bias[:u]
+                self.user_factors, self.user_bias = user_factors, user_bias
+
+            self._extra_users[user_id] = u
+            self._n_user_rows += 1
+
+        self.user_factors[u] = factors
+        self.user_bias[u] = bias
+
+    def compact(self):
+        """
+        Réintègre les utilisateurs ajoutés dans les tableaux triés (avant sauvegarde)
+        """
+        if not self._extra_users:
+            return
+
+        extra_ids = np.array(list(self._extra_users.keys()))
+        user_ids = np.concatenate([self.user_ids, extra_ids.astype(self.user_ids.dtype)])
+        order = np.argsort(user_ids, kind='stable')
+
+        self.user_ids = user_ids[order]
+        self.user_factors = self.user_factors[:self._n_user_rows][order]
+        self.user_bias = self.user_bias[:self._n_user_rows][order]
+        self._extra_users = {}
+
+    def item_indices(self, item_ids: np.ndarray) -> np.ndarray:
+        """
+        Retourne les index de lignes d'un ensemble de films (-1 si inconnu)
+        """
+        return self._lookup(self.item_ids, item_ids)
+
+    def score_items(self, user_id, item_rows: np.ndarray) -> np.ndarray:
+        """
+        Prédit les notes d'un utilisateur pour une liste de films
+
+        Reproduit SVD.predict : un utilisateur ou un film inconnu ne contribue
+        ni biais ni produit scalaire, puis la note est écrêtée.
+
+        Args:
+            user_id: ID brut de l'utilisateur
+            item_rows: Index de lignes des films (cf. item_indices, -1 si inconnu)
+
+        Returns:
+            Vecteur des notes prédites (même ordre que item_rows)
+        """
+        u = self.user_index(user_id)
+        rows = item_rows
+        known = rows >= 0
+
+        scores = np.full(len(rows), self.global_mean)
+
+        if u >= 0:
+            scores += self.user_bias[u]
+            if len(rows) >= len(self.item_ids):
+                # Un seul produit matrice-vecteur sur tous les films connus
+                item_scores = self.item_bias + self.item_factors @ self.user_factors[u]
+                scores[known] += item_scores[rows[known]]
+            else:
+                # Peu de films demandés (ex : candidats ANN) : seulement ces lignes
+                subset = rows[known]
+                scores[known] += self.item_bias[subset] + self.item_factors[subset] @ self.user_factors[u]
+        else:
+            scores[known] += self.item_bias[rows[known]]
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+
+        return scores
+
+    def predict_many(self, user_ids: np.ndarray, item_ids: np.ndarray) -> np.ndarray:
+        """
+        Prédit les notes d'une liste de couples (utilisateur, film)
+
+        Conversion des ID en bloc puis mu + bu + bi + <pu, qi> par indexation
+        vectorisée ; comme SVD.predict, un utilisateur ou un film inconnu ne
+        contribue ni biais ni produit scalaire, puis la note est écrêtée.
+
+        Args:
+            user_ids: ID bruts des utilisateurs
+            item_ids: ID bruts des films (même longueur)
+
+        Returns:
+            Vecteur des notes prédites (une par couple)
+        """
+        users = self.user_indices(np.asarray(user_ids))
+        items = self.item_indices(np.asarray(item_ids))
+        known_users = users >= 0
+        known_items = items >= 0
+        both = known_users & known_items
+
+        scores = np.full(len(users), self.global_mean)
+        scores[known_users] += self.user_bias[users[known_users]]
+        scores[known_items] += self.item_bias[items[known_items]]
+        scores[both] += np.einsum(
+            'ij,ij->i', self.user_factors[users[both]], self.item_factors[items[both]]
+        )
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+
+        return scores
+
+    def quantize(self, dtype: str = 'int8'):
+        """
+        Construit une copie quantifiée des facteurs films pour le scoring approché
+
+        En 'int8', chaque ligne qi est codée sur [-127, 127] avec son propre
+        facteur d'échelle max|qi| / 127 (8x moins de mémoire que float64) ;
+        en 'float32', simple conversion (2x moins). Les facteurs en pleine
+        précision sont conservés pour le re-classement exact des candidats :
+        en mémoire, ils s'ajoutent à la copie quantifiée (+12,5 % en int8,
+        +50 % en float32), sauf s'ils sont mappés depuis le disque (cf. load).
+
+        Args:
+            dtype: 'int8' ou 'float32'
+        """
+        if dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f"Type de quantification inconnu : {dtype}")
+
+        item_factors = np.asarray(self.item_factors, dtype=np.float32)
+
+        if dtype == 'float32':
+            self.item_codes, self.item_scale = item_factors, None
+            return
+
+        scale = np.abs(item_factors).max(axis=1) / 127
+        scale[scale == 0] = 1
+        self.item_codes = np.round(item_factors / scale[:, None]).astype(np.int8)
+        self.item_scale = scale.astype(np.float32)
+
+    def resident_item_bytes(self) -> int:
+        """
+        Mémoire résidente des facteurs films : pleine précision et copie quantifiée
+
+        Les tableaux mappés depuis le disque (mmap) ne sont pas comptés, leurs
+        pages relèvent du cache système ; un tampon partagé n'est compté qu'une fois.
+
+        Returns:
+            Nombre d'octets
+        """
+        total, counted = 0, []
+        for array in (self.item_factors, self.item_codes, self.item_scale):
+            if array is None or _is_mapped(array):
+                continue
+            if any(np.shares_memory(array, other) for other in counted):
+                continue
+            counted.append(array)
+            total += array.nbytes
+
+        return total
+
+    @property
+    def quantization(self) -> Optional[str]:
+        """
+        Type de la copie quantifiée des facteurs films (None si absente)
+        """
+        if self.item_codes is None:
+            return None
+
+        return 'int8' if self.item_scale is not None else 'float32'
+
+    def approximate_scores(self, user_id, item_rows: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Scores approchés bu + bi + <pu, qi> calculés sur les facteurs quantifiés
+
+        Seul le classement compte (ni mu ni écrêtage) : les meilleurs candidats
+        sont ensuite re-scorés exactement avec score_items. Les codes int8 sont
+        convertis par blocs de chunk_size lignes (mémoire temporaire bornée).
+
+        Args:
+            user_id: ID brut de l'utilisateur (connu du modèle)
+            item_rows: Index de lignes des films (cf. item_indices, -1 si inconnu)
+            chunk_size: Nombre de lignes converties à la fois
+
+        Returns:
+            Vecteur des scores approchés (même ordre que item_rows)
+        """
+        u = self.user_index(user_id)
+        user_vector = np.asarray(self.user_factors[u], dtype=np.float32)
+
+        item_scores = np.empty(len(self.item_codes), dtype=np.float32)
+        for start in range(0, len(self.item_codes), chunk_size):
+            codes = self.item_codes[start:start + chunk_size]
+            item_scores[start:start + chunk_size] = codes.astype(np.float32, copy=False) @ user_vector
+
+        if self.item_scale is not None:
+            item_scores *= self.item_scale
+        item_scores += self.item_bias
+
+        known = item_rows >= 0
+        scores = np.full(len(item_rows), self.user_bias[u], dtype=np.float32)
+        scores[known] += item_scores[item_rows[known]]
+
+        return scores
+
+    def approximate_score_users(self, users: np.ndarray, item_rows: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Scores approchés d'un bloc d'utilisateurs (version matricielle de approximate_scores)
+
+        Args:
+            users: Index de lignes des utilisateurs (connus du modèle)
+            item_rows: Index de lignes des films (cf. item_indices, -1 si inconnu)
+            chunk_size: Nombre de lignes de codes converties à la fois
+
+        Returns:
+            Matrice float32 des scores approchés (len(users) x len(item_rows))
+        """
+        user_vectors = np.asarray(self.user_factors[users], dtype=np.float32)
+
+        item_scores = np.empty((len(users), len(self.item_codes)), dtype=np.float32)
+        for start in range(0, len(self.item_codes), chunk_size):
+            codes = self.item_codes[start:start + chunk_size]
+            item_scores[:, start:start + chunk_size] = user_vectors @ codes.astype(np.float32, copy=False).T
+
+        if self.item_scale is not None:
+            item_scores *= self.item_scale
+        item_scores += self.item_bias
+
+        known = item_rows >= 0
+        scores = np.zeros((len(users), len(item_rows)), dtype=np.float32)
+        scores[:, known] = item_scores[:, item_rows[known]]
+        scores += np.asarray(self.user_bias[users], dtype=np.float32)[:, None]
+
+        return scores
+
+    def score_users(self, user_ids: np.ndarray, item_rows: np.ndarray) -> np.ndarray:
+        """
+        Prédit les notes d'un bloc d'utilisateurs pour une liste de films
+
+        Un seul produit matrice-matrice facteurs utilisateurs x facteurs films.
+
+        Args:
+            user_ids: ID bruts des utilisateurs du bloc
+            item_rows: Index de lignes des films (cf. item_indices, -1 si inconnu)
+
+        Returns:
+            Matrice des notes prédites (len(user_ids) x len(item_rows))
+        """
+        users = self.user_indices(user_ids)
+        known_users = users >= 0
+        known_items = item_rows >= 0
+
+        user_bias = np.zeros(len(users))
+        user_bias[known_users] = self.user_bias[users[known_users]]
+        item_bias = np.zeros(len(item_rows))
+        item_bias[known_items] = self.item_bias[item_rows[known_items]]
+
+        scores = self.global_mean + user_bias[:, None] + item_bias[None, :]
+
+        if known_users.any() and known_items.any():
+            dots = self.user_factors[users[known_users]] @ self.item_factors[item_rows[known_items]].T
+            scores[np.ix_(known_users, known_items)] += dots
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+
+        return scores
+
+    def save(self, directory, metadata: Optional[dict] = None):
+        """
+        Sauvegarde les facteurs dans un répertoire d'artefact
+
+        Chaque tableau est écrit dans son propre fichier .npy (chargeable en
+        mmap), accompagné d'un manifeste JSON.
+
+        Args:
+            directory: Répertoire de l'artefact (créé si besoin)
+            metadata: Informations supplémentaires à inscrire dans le manifeste
+        """
+        self.compact()
+
+        # Écriture dans un répertoire temporaire puis remplacement : les
+        # fichiers de l'artefact existant (éventuellement mappés en mémoire
+        # par ce scorer) ne sont jamais réécrits en place
+        with atomic_directory(directory) as target:
+            arrays = {}
+            for name in ARTIFACT_ARRAYS:
+                array = np.ascontiguousarray(getattr(self, name))
+                np.save(target / f"{name}.npy", array, allow_pickle=False)
+                arrays[name] = {
+                    'file': f"{name}.npy",
+                    'dtype': str(array.dtype),
+                    'shape': list(array.shape)
+                }
+
+            quantization = None
+            if self.item_codes is not None:
+                quantization = {'dtype': self.quantization, 'arrays': {}}
+                for name in QUANTIZED_ARRAYS:
+                    if getattr(self, name) is None:
+                        continue
+                    array = np.ascontiguousarray(getattr(self, name))
+                    np.save(target / f"{name}.npy", array, allow_pickle=False)
+                    quantization['arrays'][name] = {
+                        'file': f"{name}.npy",
+                        'dtype': str(array.dtype),
+                        'shape': list(array.shape)
+                    }
+
+            manifest = {
+                'format': ARTIFACT_FORMAT,
+                'version': ARTIFACT_VERSION,
+                'global_mean': float(self.global_mean),
+                'rating_scale': [float(v) for v in self.rating_scale] if self.rating_scale is not None else None,
+                'n_users': int(len(self.user_ids)),
+                'n_items': int(len(self.item_ids)),
+                'n_factors': int(self.item_factors.shape[1]),
+                'arrays': arrays,
+                'quantization': quantization,
+                'metadata': metadata or {}
+            }
+
+            # Sérialisé avant l'ouverture du fichier : une erreur ne laisse
+            # pas de manifeste tronqué
+            content = json.dumps(manifest, indent=2, default=_json_default)
+            with open(target / MANIFEST_FILE, 'w') as f:
+                f.write(content)
+
+    @classmethod
+    def load(cls, directory, mmap_mode: Optional[str] = None):
+        """
+        Charge les facteurs depuis un répertoire d'artefact
+
+        Si l'artefact contient une copie quantifiée, les facteurs films en
+        pleine précision sont toujours mappés en lecture seule ('r') : seul le
+        re-classement des candidats les lit, ils ne doivent pas s'ajouter en
+        mémoire résidente à la copie quantifiée.
+
+        Args:
+            directory: Répertoire de l'artefact
+            mmap_mode: Mode de np.load ('r' pour partager les pages entre processus)
+
+        Returns:
+            Tuple (FactorScorer, manifeste)
+        """
+        directory = Path(directory)
+        manifest = read_manifest(directory)
+        quantization = manifest.get('quantization')
+
+        modes = {name: mmap_mode for name in manifest['arrays']}
+        if quantization and mmap_mode is None:
+            modes['item_factors'] = 'r'
+
+        arrays = {
+            name: np.load(directory / spec['file'], mmap_mode=modes[name], allow_pickle=False)
+            for name, spec in manifest['arrays'].items()
+        }
+
+        scorer = cls(
+            global_mean=manifest['global_mean'],
+            rating_scale=manifest['rating_scale'],
+            **arrays
+        )
+
+        # Copie quantifiée éventuelle (artefacts plus récents)
+        if quantization:
+            for name, spec in quantization['arrays'].items():
+                setattr(scorer, name, np.load(directory / spec['file'], mmap_mode=mmap_mode, allow_pickle=False))
+
+        return scorer, manifest
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    """
+    Indique si un tableau (ou le tableau dont il est une vue) est mappé depuis le disque
+    """
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+
+    return False
+
+
+@contextmanager
+def atomic_directory(directory):
+    """
+    Répertoire temporaire qui remplace directory à la sortie du bloc
+
+    Le contenu est écrit dans un répertoire frère, puis échangé par
+    renommage avec l'ancien répertoire (supprimé ensuite). En cas d'erreur,
+    l'ancien contenu est conservé tel quel. Les fichiers de l'ancien
+    répertoire encore mappés en mémoire restent lisibles.
+
+    Args:
+        directory: Répertoire final
+
+    Yields:
+        Path du répertoire temporaire où écrire
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", suffix='.tmp', dir=directory.parent))
+
+    try:
+        yield tmp
+        os.chmod(tmp, 0o755)
+
+        backup = None
+        if directory.exists():
+            backup = tmp.with_name(tmp.name[:-len('.tmp')] + '.old')
+            os.replace(directory, backup)
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if backup is not None:
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def _json_default(value):
+    """
+    Convertit les types NumPy en types Python pour json
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+
+def read_manifest(directory) -> dict:
+    """
+    Lit et valide le manifeste d'un artefact de facteurs
+
+    Args:
+        directory: Répertoire de l'artefact
+
+    Returns:
+        Manifeste (dict)
+    """
+    manifest_path = Path(directory) / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifeste introuvable : {manifest_path}")
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Format d'artefact inconnu : {manifest.get('format')}")
+    if manifest.get('version', 0) > ARTIFACT_VERSION:
+        raise ValueError(f"Version d'artefact non supportée : {manifest.get('version')}")
+
+    return manifest
+
+
+def is_artifact(path) -> bool:
+    """
+    Indique si un chemin est un répertoire d'artefact de facteurs
+    """
+    return (Path(path) / MANIFEST_FILE).exists()
@@ -0,0 +1,118 @@
+"""
+SGD par mini-lots en NumPy sur les facteurs d'un FactorScorer (reprise d'entraînement)
+"""
+import numpy as np
+from typing import Optional
+
+from .scoring import FactorScorer
+
+
+def grow_scorer(
+    scorer: FactorScorer,
+    user_ids: np.ndarray,
+    item_ids: np.ndarray,
+    init_std: float = 0.1,
+    random_state: Optional[int] = None
+) -> FactorScorer:
+    """
+    Retourne un nouveau scorer contenant aussi les utilisateurs et films inconnus
+
+    Les nouvelles lignes sont initialisées comme dans Surprise (facteurs
+    N(0, init_std), biais nuls), puis les tables sont retriées par ID. Les
+    tableaux sont copiés en mémoire (float64) : le scorer d'origine, éventuellement
+    chargé en mmap, n'est pas modifié.
+
+    Args:
+        scorer: Scorer existant
+        user_ids: ID des utilisateurs des nouvelles données
+        item_ids: ID des films des nouvelles données
+        init_std: Écart-type de l'initialisation des nouveaux facteurs
+        random_state: Seed pour l'initialisation
+
+    Returns:
+        Nouvelle instance de FactorScorer
+    """
+    rng = np.random.default_rng(random_state)
+    scorer.compact()
+
+    def grow(ids, factors, bias, new_ids):
+        new_ids = np.unique(new_ids)
+        new_ids = new_ids[FactorScorer._lookup(ids, new_ids) < 0]
+
+        all_ids = np.concatenate([ids, new_ids.astype(ids.dtype)])
+        all_factors = np.vstack([
+            np.asarray(factors, dtype=np.float64),
+            rng.normal(0, init_std, (len(new_ids), factors.shape[1]))
+        ])
+        all_bias = np.concatenate([np.asarray(bias, dtype=np.float64), np.zeros(len(new_ids))])
+
+        order = np.argsort(all_ids, kind='stable')
+        return all_ids[order], all_factors[order], all_bias[order]
+
+    new_user_ids, user_factors, user_bias = grow(
+        scorer.user_ids, scorer.user_factors, scorer.user_bias, user_ids
+    )
+    new_item_ids, item_factors, item_bias = grow(
+        scorer.item_ids, scorer.item_factors, scorer.item_bias, item_ids
+    )
+
+    return FactorScorer(
+        user_factors=user_factors,
+        item_factors=item_factors,
+        user_bias=user_bias,
+        item_bias=item_bias,
+        global_mean=scorer.global_mean,
+        user_ids=new_user_ids,
+        item_ids=new_item_ids,
+        rating_scale=scorer.rating_scale
+    )
+
+
+def sgd_epochs(
+    scorer: FactorScorer,
+    users: np.ndarray,
+    items: np.ndarray,
+    ratings: np.ndarray,
+    n_epochs: int,
+    lr: float,
+    reg: float,
+    batch_size: int = 1024,
+    random_state: Optional[int] = None
+):
+    """
+    Met à jour les facteurs du scorer en place par SGD sur des ratings
+
+    Même règle de mise à jour que surprise.SVD (erreur sur la note non écrêtée,
+    régularisation des biais et des facteurs), appliquée par mini-lots : les
+    gradients d'un lot sont calculés avec les mêmes facteurs puis cumulés.
+
+    Args:
+        scorer: Scorer à mettre à jour (tableaux modifiables)
+        users: Index de lignes des utilisateurs (cf. user_indices)
+        items: Index de lignes des films (cf. item_indices)
+        ratings: Notes associées
+        n_epochs: Nombre de passes sur les ratings (mélangés à chaque passe)
+        lr: Pas d'apprentissage
+        reg: Coefficient de régularisation
+        batch_size: Nombre de ratings par mini-lot
+        random_state: Seed pour le mélange
+    """
+    rng = np.random.default_rng(random_state)
+    pu, qi = scorer.user_factors, scorer.item_factors
+    bu, bi = scorer.user_bias, scorer.item_bias
+
+    for _ in range(n_epochs):
+        order = rng.permutation(len(ratings))
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            u, i, r = users[batch], items[batch], ratings[batch]
+
+            p, q = pu[u], qi[i]
+            err = r - (scorer.global_mean + bu[u] + bi[i] + np.einsum('ij,ij->i', p, q))
+
+            np.add.at(bu, u, lr * (err - reg * bu[u]))
+            np.add.at(bi, i, lr * (err - reg * bi[i]))
+            np.add.at(pu, u, lr * (err[:, None] * q - reg * p))
+            np.add.at(qi, i, lr * (err[:, None] * p - reg * q))
+
@@ -0,0 +1,265 @@
+"""
+Recherche d'hyperparamètres du modèle Collaborative, en parallèle sur plusieurs processus
+"""
+import contextlib
+import io
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import SVD_CONFIG
+from ..utils.metrics import rating_errors
+
+
+RATING_COLUMNS = ('user_id', 'item_id', 'rating')
+
+
+class SharedRatings:
+    """
+    Colonnes d'un DataFrame de ratings copiées une fois en mémoire partagée
+
+    Les workers s'y rattachent par nom (cf. spec / attach) : les tableaux ne
+    sont jamais picklés vers chaque processus.
+    """
+
+    def __init__(self, ratings_df: pd.DataFrame):
+        """
+        Copie les colonnes user_id, item_id, rating en mémoire partagée
+
+        Args:
+            ratings_df: DataFrame des ratings
+        """
+        self._blocks = []
+        self.columns = {}
+
+        for column in RATING_COLUMNS:
+            values = ratings_df[column].to_numpy()
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+
+            self._blocks.append(block)
+            self.columns[column] = (block.name, values.dtype.str, values.shape)
+
+    def spec(self) -> Dict:
+        """
+        Description picklable des segments (nom, dtype, forme par colonne)
+        """
+        return dict(self.columns)
+
+    @staticmethod
+    def attach(spec: Dict):
+        """
+        Se rattache aux segments décrits par spec
+
+        Args:
+            spec: Résultat de SharedRatings.spec()
+
+        Returns:
+            Tuple (DataFrame des ratings, segments à garder ouverts)
+        """
+        blocks = []
+        columns = {}
+        for column, (name, dtype, shape) in spec.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            columns[column] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+        return pd.DataFrame(columns, copy=False), blocks
+
+    def close(self):
+        """
+        Libère les segments (à appeler par le processus qui les a créés)
+        """
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+# État d'un worker : ratings de train et de validation rattachés une fois
+_WORKER_DATA = {}
+
+
+def _init_worker(train_spec: Dict, valid_spec: Dict):
+    """
+    Initialise un worker : rattachement aux ratings en mémoire partagée
+    """
+    train_df, train_blocks = SharedRatings.attach(train_spec)
+    valid_df, valid_blocks = SharedRatings.attach(valid_spec)
+
+    _WORKER_DATA['train'] = train_df
+    _WORKER_DATA['valid'] = valid_df
+    _WORKER_DATA['blocks'] = train_blocks + valid_blocks
+
+
+def _run_trial(trial_id: int, params: Dict, rung: int) -> Dict:
+    """
+    Entraîne un modèle sur le train partagé et l'évalue sur la validation
+
+    Returns:
+        dict avec trial_id, rung, params, rmse, mae et seconds
+    """
+    from .collaborative import CollaborativeModel
+
+    train_df = _WORKER_DATA['train']
+    valid_df = _WORKER_DATA['valid']
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = CollaborativeModel(**params)
+        model.fit(train_df)
+
+    predictions = model.predict_many(valid_df['user_id'].to_numpy(), valid_df['item_id'].to_numpy())
+    errors = rating_errors(predictions, valid_df['rating'].to_numpy())
+
+    return {
+        'trial_id': trial_id,
+        'rung': rung,
+        'params': params,
+        **errors,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def sample_configs(
+    param_grid: Dict[str, List],
+    method: str = 'grid',
+    n_trials: Optional[int] = None,
+    random_state: int = 42
+) -> List[Dict]:
+    """
+    Génère les configurations à tester
+
+    Args:
+        param_grid: Valeurs possibles par paramètre (ex : {'n_factors': [50, 100]})
+        method: 'grid' (toutes les combinaisons) ou 'random' (n_trials tirées sans remise)
+        n_trials: Nombre de configurations en mode 'random'
+        random_state: Seed pour le tirage
+
+    Returns:
+        Liste de dicts de paramètres
+    """
+    names = list(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+    if method == 'grid':
+        return combinations
+
+    if method == 'random':
+        rng = np.random.default_rng(random_state)
+        n_trials = min(n_trials or len(combinations), len(combinations))
+        picked = rng.choice(len(combinations), n_trials, replace=False)
+        return [combinations[i] for i in picked]
+
+    raise ValueError(f"Méthode de recherche inconnue : {method}")
+
+
+def search(
+    ratings_df: pd.DataFrame,
+    param_grid: Dict[str, List],
+    method: str = 'grid',
+    n_trials: Optional[int] = None,
+    eta: int = 3,
+    n_rungs: Optional[int] = None,
+    valid_size: float = 0.2,
+    n_jobs: Optional[int] = None,
+    random_state: int = 42,
+    callback: Optional[Callable[[Dict], None]] = None
+) -> pd.DataFrame:
+    """
+    Recherche d'hyperparamètres par successive halving sur un pool de processus
+
+    À chaque palier, toutes les configurations restantes sont entraînées avec
+    une fraction 1/eta^(paliers restants) de leurs époques, puis seul le
+    meilleur tiers (1/eta) selon la RMSE de validation passe au palier
+    suivant. Le dernier palier utilise toutes les époques.
+
+    Args:
+        ratings_df: DataFrame avec colonnes user_id, item_id, rating
+        param_grid: Valeurs possibles par paramètre de SVD_CONFIG
+        method: 'grid' ou 'random' (cf. sample_configs)
+        n_trials: Nombre de configurations en mode 'random'
+        eta: Facteur de réduction entre deux paliers
+        n_rungs: Nombre de paliers (default : jusqu'à ne garder qu'une configuration)
+        valid_size: Proportion des ratings gardée pour la validation
+        n_jobs: Nombre de processus (default : nombre de cœurs)
+        random_state: Seed du split et du tirage
+        callback: Fonction appelée (dans le processus parent) avec le
+            résultat de chaque essai, dès qu'il est terminé
+
+    Returns:
+        DataFrame des essais (trial_id, rung, paramètres dont les époques du
+        palier, rmse, mae, seconds), meilleur essai du dernier palier en tête
+    """
+    configs = sample_configs(param_grid, method, n_trials, random_state)
+    if n_rungs is None:
+        n_rungs = math.ceil(math.log(len(configs), eta) - 1e-9) + 1 if len(configs) > 1 else 1
+
+    # Split aléatoire train / validation
+    rng = np.random.default_rng(random_state)
+    is_valid = rng.random(len(ratings_df)) < valid_size
+    train = SharedRatings(ratings_df.loc[~is_valid, list(RATING_COLUMNS)])
+    valid = SharedRatings(ratings_df.loc[is_valid, list(RATING_COLUMNS)])
+
+    results = []
+    survivors = list(enumerate(configs))
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(train.spec(), valid.spec())
+        ) as executor:
+            for rung in range(n_rungs):
+                fraction = eta ** -(n_rungs - 1 - rung)
+                print(f"Palier {rung + 1}/{n_rungs} : {len(survivors)} configurations, "
+                      f"{fraction:.0%} des époques")
+
+                futures = [
+                    executor.submit(_run_trial, trial_id, _with_budget(params, fraction), rung)
+                    for trial_id, params in survivors
+                ]
+
+                rung_results = []
+                for future in as_completed(futures):
+                    result = future.result()
+                    rung_results.append(result)
+                    if callback is not None:
+                        callback(result)
+                results.extend(rung_results)
+
+                # Garder le meilleur 1/eta pour le palier suivant
+                n_keep = max(1, len(survivors) // eta)
+                best = sorted(rung_results, key=lambda r: r['rmse'])[:n_keep]
+                survivors = [(r['trial_id'], configs[r['trial_id']]) for r in best]
+    finally:
+        train.close()
+        valid.close()
+
+    return pd.DataFrame([
+        {'trial_id': r['trial_id'], 'rung': r['rung'], **r['params'],
+         'rmse': r['rmse'], 'mae': r['mae'], 'seconds': r['seconds']}
+        for r in results
+    ]).sort_values(['rung', 'rmse'], ascending=[False, True], ignore_index=True)
+
+
+def _with_budget(params: Dict, fraction: float) -> Dict:
+    """
+    Paramètres complets d'un essai, avec une fraction des époques
+
+    Les essais tournent dans des processus parallèles : l'ALS y utilise un
+    seul thread pour ne pas surcharger les cœurs.
+    """
+    params = {**SVD_CONFIG, **params}
+    epochs_key = 'n_epochs' if params['algorithm'] == 'svd' else 'als_epochs'
+    params[epochs_key] = max(1, round(params[epochs_key] * fraction))
+    params['als_n_jobs'] = 1
+
+    return params
@@ -0,0 +1,244 @@
+"""
+Cache LRU + TTL des recommandations
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Hashable, List, Optional, Tuple
+
+from ..config import CACHE_CONFIG
+
+
+# Valeur par défaut de ttl : distingue "non fourni" (config) de None (pas d'expiration)
+_DEFAULT_TTL = object()
+
+
+class RecommendationCache:
+    """
+    Cache des recommandations, clé (user_id, n, model_type, version, options)
+
+    Taille bornée (éviction LRU) et durée de vie des entrées (TTL). Les
+    entrées d'un utilisateur peuvent être invalidées d'un coup, par exemple
+    quand ses ratings changent. Utilisable depuis plusieurs threads.
+
+    Chaque invalidation incrémente la génération de l'utilisateur : un
+    résultat calculé avant l'invalidation (cf. generation / put) n'est pas
+    stocké après elle.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: Optional[float] = _DEFAULT_TTL):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Nombre maximum d'entrées (default depuis config)
+            ttl: Durée de vie d'une entrée en secondes (default depuis config,
+                None = pas d'expiration)
+        """
+        self.max_entries = max_entries if max_entries is not None else CACHE_CONFIG['max_entries']
+        self.ttl = CACHE_CONFIG['ttl'] if ttl is _DEFAULT_TTL else ttl
+
+        self._entries = OrderedDict()  # clé -> (expiration, valeur)
+        self._user_keys = defaultdict(set)  # user_id -> clés de l'utilisateur
+        self._generations = defaultdict(int)  # user_id -> nombre d'invalidations
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        user_id,
+        n: int,
+        model_type: str,
+        version: Hashable = None,
+        options: Tuple = ()
+    ) -> Tuple:
+        """
+        Construit la clé d'une entrée
+
+        Args:
+            options: Autres paramètres de recommend, en paires (nom, valeur) triées
+        """
+        return (user_id, n, model_type, version, options)
+
+    def generation(self, user_id) -> int:
+        """
+        Génération courante d'un utilisateur (à lire avant de calculer une valeur)
+        """
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """
+        Cherche une entrée dans le cache
+
+        Args:
+            key: Clé construite par make_key
+
+        Returns:
+            Tuple (trouvé, valeur)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Tuple, value: Any, generation: Optional[int] = None) -> bool:
+        """
+        Ajoute (ou remplace) une entrée, en évinçant la moins récente si plein
+
+        Args:
+            key: Clé construite par make_key
+            value: Valeur à stocker (de préférence immuable)
+            generation: Génération de l'utilisateur lue avant le calcul de
+                value ; si elle a changé depuis, value est périmée et ignorée
+
+        Returns:
+            True si la valeur a été stockée
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                return False
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (expires_at, value)
+            self._user_keys[key[0]].add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+            return True
+
+    def invalidate_user(self, user_id) -> int:
+        """
+        Supprime toutes les entrées d'un utilisateur
+
+        Args:
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self._lock:
+            self._generations[user_id] += 1
+            keys = list(self._user_keys.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+
+            return len(keys)
+
+    def watch(self, interactions):
+        """
+        Invalide automatiquement les entrées d'un utilisateur quand ses ratings
+        changent dans un InteractionStore (cf. InteractionStore.add_ratings)
+        """
+        interactions.subscribe(self.invalidate_user)
+
+    def clear(self):
+        """
+        Vide le cache (les compteurs sont conservés)
+        """
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def stats(self) -> dict:
+        """
+        Retourne les compteurs du cache
+
+        Returns:
+            dict avec 'size', 'hits', 'misses', 'hit_rate', 'evictions'
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Tuple):
+        """
+        Supprime une entrée (le verrou doit être détenu)
+        """
+        self._entries.pop(key, None)
+
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+
+class CachedRecommender:
+    """
+    Enveloppe un modèle (Collaborative, Content-Based ou Hybrid) et met en
+    cache le résultat de recommend
+
+    Les autres attributs et méthodes sont délégués au modèle, l'enveloppe peut
+    donc être passée partout où le modèle est attendu (ex : HybridModel).
+    """
+
+    def __init__(
+        self,
+        model,
+        cache: RecommendationCache,
+        model_type: str,
+        version: Hashable = None
+    ):
+        """
+        Initialise l'enveloppe
+
+        Args:
+            model: Modèle entraîné exposant recommend(user_id, interactions, catalog, n)
+            cache: Cache partagé
+            model_type: Type du modèle ('collaborative', 'content', 'hybrid')
+            version: Version du modèle (à changer à chaque réentraînement)
+        """
+        self.model = model
+        self.cache = cache
+        self.model_type = model_type
+        self.version = version
+
+    def recommend(self, user_id, interactions, catalog, n: int = 10, **kwargs) -> List[int]:
+        """
+        Retourne les recommandations en cache, ou les calcule et les stocke
+
+        Les paramètres supplémentaires (ex : approximate) sont transmis au
+        modèle et font partie de la clé. Si l'utilisateur est invalidé pendant
+        le calcul, le résultat est retourné mais pas mis en cache.
+        """
+        key = self.cache.make_key(
+            user_id, n, self.model_type, self.version, tuple(sorted(kwargs.items()))
+        )
+
+        found, items = self.cache.get(key)
+        if not found:
+            generation = self.cache.generation(user_id)
+            items = tuple(self.model.recommend(user_id, interactions, catalog, n=n, **kwargs))
+            self.cache.put(key, items, generation=generation)
+
+        return list(items)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
@@ -2,7 +2,8 @@
 Module d'évaluation pour les systèmes de recommandation
 """
 import numpy as np
-from typing import List
+import pandas as pd
+from typing import List, Sequence
 
 
 def precision_at_k(
@@ -101,4 +102,128 @@ def ndcg_at_k(
     if idcg == 0:
         return 0.0
     
-    return dcg / idcg
\ No newline at end of file
+    return dcg / idcg
+
+
+RANKING_METRICS = ('precision', 'recall', 'ndcg', 'map', 'mrr', 'hit_rate')
+
+
+def hit_matrix(
+    recommendations: np.ndarray, 
+    relevant_indptr: np.ndarray, 
+    relevant_items: np.ndarray
+) -> np.ndarray:
+    """
+    Indique quels films recommandés sont pertinents, pour tous les utilisateurs
+    
+    Args:
+        recommendations: Matrice (n_users x max_k) des item_id recommandés,
+            ordonnés, complétée par -1
+        relevant_indptr: Offsets CSR des films pertinents (n_users + 1)
+        relevant_items: item_id pertinents, regroupés par utilisateur
+        
+    Returns:
+        Matrice booléenne (n_users x max_k)
+    """
+    recommendations = np.asarray(recommendations, dtype=np.int64)
+    relevant_items = np.asarray(relevant_items, dtype=np.int64)
+    n_users = len(recommendations)
+    
+    if len(relevant_items) == 0 or recommendations.size == 0:
+        return np.zeros(recommendations.shape, dtype=bool)
+    
+    # Clé unique (ligne utilisateur, film), triée pour une recherche dichotomique
+    width = int(max(relevant_items.max(), recommendations.max())) + 1
+    rows = np.repeat(np.arange(n_users, dtype=np.int64), np.diff(relevant_indptr))
+    relevant_keys = np.sort(rows * width + relevant_items)
+    
+    keys = np.arange(n_users, dtype=np.int64)[:, None] * width + recommendations
+    found_at = np.minimum(np.searchsorted(relevant_keys, keys), len(relevant_keys) - 1)
+    
+    return (relevant_keys[found_at] == keys) & (recommendations >= 0)
+
+
+def ranking_metrics(
+    recommendations: np.ndarray, 
+    relevant_indptr: np.ndarray, 
+    relevant_items: np.ndarray, 
+    k_values: Sequence[int]
+) -> pd.DataFrame:
+    """
+    Calcule les métriques de classement de tous les utilisateurs, pour tous les K
+    
+    Version vectorisée de precision_at_k, recall_at_k et ndcg_at_k (mêmes
+    valeurs), complétée par MAP@K (moyenne des précisions aux rangs
+    pertinents, divisée par min(nb pertinents, K)), MRR@K (inverse du rang
+    du premier film pertinent) et le hit rate (au moins un film pertinent).
+    
+    Args:
+        recommendations: Matrice (n_users x max_k) des item_id recommandés,
+            ordonnés, complétée par -1
+        relevant_indptr: Offsets CSR des films pertinents (n_users + 1)
+        relevant_items: item_id pertinents, regroupés par utilisateur
+        k_values: Valeurs de K (au plus max_k)
+        
+    Returns:
+        DataFrame avec une ligne par (utilisateur, K) : colonnes user_row, k
+        et une colonne par métrique de RANKING_METRICS
+    """
+    hits = hit_matrix(recommendations, relevant_indptr, relevant_items)
+    n_users, max_k = hits.shape
+    n_relevant = np.diff(relevant_indptr)
+    
+    # Remises log2(rang + 1) et précisions cumulées, calculées une fois pour tous les K
+    discounts = 1.0 / np.log2(np.arange(2, max_k + 2))
+    ideal_dcg = np.r_[0.0, np.cumsum(discounts)]
+    cum_hits = np.cumsum(hits, axis=1)
+    precision_at_rank = np.where(hits, cum_hits / np.arange(1, max_k + 1), 0.0)
+    cum_precision = np.cumsum(precision_at_rank, axis=1)
+    dcg = np.cumsum(hits * discounts, axis=1)
+    first_hit = np.argmax(np.c_[hits, np.ones(n_users, dtype=bool)], axis=1)  # max_k si aucun
+    
+    frames = []
+    for k in k_values:
+        if k > max_k:
+            raise ValueError(f"K={k} dépasse le nombre de recommandations ({max_k})")
+        
+        n_hits = cum_hits[:, k - 1] if k > 0 else np.zeros(n_users)
+        n_ideal = np.minimum(n_relevant, k)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frames.append(pd.DataFrame({
+                'user_row': np.arange(n_users),
+                'k': k,
+                'precision': n_hits / k if k > 0 else np.zeros(n_users),
+                'recall': np.where(n_relevant > 0, n_hits / n_relevant, 0.0),
+                'ndcg': np.where(n_ideal > 0, dcg[:, k - 1] / ideal_dcg[n_ideal], 0.0),
+                'map': np.where(n_ideal > 0, cum_precision[:, k - 1] / n_ideal, 0.0),
+                'mrr': np.where(first_hit < k, 1.0 / (first_hit + 1), 0.0),
+                'hit_rate': (first_hit < k).astype(np.float64)
+            }))
+    
+    return pd.concat(frames, ignore_index=True)
+
+
+def rating_errors(
+    predictions: np.ndarray, 
+    ratings: np.ndarray
+) -> dict:
+    """
+    Calcule la RMSE et la MAE de notes prédites
+    
+    Args:
+        predictions: Notes prédites
+        ratings: Notes réelles (même ordre)
+        
+    Returns:
+        dict avec 'rmse' et 'mae'
+    """
+    errors = np.asarray(predictions, dtype=np.float64) - np.asarray(ratings, dtype=np.float64)
+    
+    if len(errors) == 0:
+        return {'rmse': 0.0, 'mae': 0.0}
+    
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors)))
+    }
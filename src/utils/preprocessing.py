@@ -3,55 +3,75 @@ Module de prétraitement des données
 """
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Optional, Tuple, Union
+
+from ..data.interactions import InteractionStore, as_interactions
 
 
 def create_user_train_test_split(
     ratings_df: pd.DataFrame, 
     test_size: float = 0.2, 
-    random_state: int = 42
+    random_state: int = 42,
+    method: str = 'random',
+    n_last: Optional[int] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Crée un train/test split pour chaque utilisateur
     
-    Pour chaque utilisateur, on sépare ses ratings en train (80%) et test (20%)
+    Pour chaque utilisateur, on sépare ses ratings en train (80%) et test (20%),
+    avec au moins un rating en test. Le rang de chaque rating dans son
+    utilisateur est calculé en un seul tri pour tout le DataFrame.
     
     Args:
         ratings_df: DataFrame avec les ratings
         test_size: Proportion du test set (default: 0.2)
         random_state: Seed pour reproductibilité
+        method: 'random' (ratings tirés au hasard) ou 'temporal' (les plus
+            récents selon la colonne timestamp)
+        n_last: En mode 'temporal', nombre fixe de ratings gardés en test par
+            utilisateur (leave-last-N-out) au lieu de test_size
         
     Returns:
         Tuple (train_df, test_df)
     """
-    np.random.seed(random_state)
+    users = ratings_df['user_id'].to_numpy()
+    positions = np.arange(len(ratings_df))
     
-    train_list = []
-    test_list = []
+    # Ordre de sortie dans chaque utilisateur : les premiers vont en test
+    if method == 'random':
+        keys = np.random.default_rng(random_state).random(len(ratings_df))
+        order = np.lexsort((keys, users))
+    elif method == 'temporal':
+        # Plus récent en premier (à timestamp égal, la dernière ligne d'abord)
+        timestamps = ratings_df['timestamp'].to_numpy()
+        order = np.lexsort((-positions, -timestamps, users))
+    else:
+        raise ValueError(f"Méthode de split inconnue : {method}")
     
-    for user_id in ratings_df['user_id'].unique():
-        user_data = ratings_df[ratings_df['user_id'] == user_id]
-        
-        # Mélanger les ratings de l'utilisateur
-        user_data = user_data.sample(frac=1, random_state=random_state)
-        
-        # Calculer le split
-        n_test = max(1, int(len(user_data) * test_size))
-        
-        test_data = user_data.iloc[:n_test]
-        train_data = user_data.iloc[n_test:]
-        
-        train_list.append(train_data)
-        test_list.append(test_data)
+    # Rang dans l'utilisateur et nombre de ratings de l'utilisateur
+    sorted_users = users[order]
+    is_start = np.r_[True, sorted_users[1:] != sorted_users[:-1]] if len(order) else np.empty(0, dtype=bool)
+    starts = np.flatnonzero(is_start)
+    sizes = np.diff(np.r_[starts, len(order)])
+    rank = positions - np.repeat(starts, sizes)
+    user_size = np.repeat(sizes, sizes)
+    
+    if method == 'temporal' and n_last is not None:
+        n_test = np.minimum(n_last, user_size)
+    else:
+        n_test = np.maximum(1, (user_size * test_size).astype(np.int64))
     
-    train_df = pd.concat(train_list, ignore_index=True)
-    test_df = pd.concat(test_list, ignore_index=True)
+    is_test = np.empty(len(order), dtype=bool)
+    is_test[order] = rank < n_test
+    
+    train_df = ratings_df[~is_test].reset_index(drop=True)
+    test_df = ratings_df[is_test].reset_index(drop=True)
     
     return train_df, test_df
 
 def get_relevant_items(
     user_id: int, 
-    test_df: pd.DataFrame, 
+    test_df: Union[InteractionStore, pd.DataFrame], 
     min_rating: int = 4
 ) -> list:
     """
@@ -59,17 +79,59 @@ def get_relevant_items(
     
     Args:
         user_id: ID de l'utilisateur
-        test_df: DataFrame de test
+        test_df: Ratings de test (InteractionStore ou DataFrame)
         min_rating: Note minimum pour être considéré comme pertinent (default: 4)
         
     Returns:
         Liste des item_id pertinents
     """
+    if isinstance(test_df, InteractionStore):
+        return test_df.liked_items(user_id, min_rating).tolist()
+    
     user_test = test_df[test_df['user_id'] == user_id]
     relevant = user_test[user_test['rating'] >= min_rating]
     
     return relevant['item_id'].tolist()
 
+def relevant_items_csr(
+    user_ids, 
+    test_df: Union[InteractionStore, pd.DataFrame], 
+    min_rating: int = 4
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Films pertinents de plusieurs utilisateurs, au format CSR (cf. ranking_metrics)
+    
+    Args:
+        user_ids: ID des utilisateurs (ligne i <-> user_ids[i])
+        test_df: Ratings de test (InteractionStore ou DataFrame)
+        min_rating: Note minimum pour être considéré comme pertinent (default: 4)
+        
+    Returns:
+        Tuple (indptr, item_ids) : les films pertinents de user_ids[i] sont
+        item_ids[indptr[i]:indptr[i+1]]
+    """
+    test = as_interactions(test_df)
+    rows = test.user_rows(np.asarray(user_ids))
+    
+    # Nombre de films pertinents avant chaque position du CSR de test
+    liked = test.ratings >= min_rating
+    liked_before = np.r_[0, np.cumsum(liked)]
+    
+    known = rows >= 0
+    starts = np.where(known, test.indptr[np.maximum(rows, 0)], 0)
+    stops = np.where(known, test.indptr[np.maximum(rows, 0) + 1], 0)
+    counts = liked_before[stops] - liked_before[starts]
+    
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    
+    # Positions CSR de tous les ratings des utilisateurs demandés, puis filtre
+    spans = stops - starts
+    positions = np.repeat(starts - np.r_[0, np.cumsum(spans)[:-1]], spans) + np.arange(spans.sum())
+    positions = positions[liked[positions]]
+    
+    return indptr, test.item_ids[positions]
+
 def normalize_scores(
     scores_df: pd.DataFrame, 
     score_column: str
@@ -98,3 +160,42 @@ def normalize_scores(
     return scores_df
 
 
+
+def normalize_score_vector(
+    scores: np.ndarray, 
+    method: str = 'minmax'
+) -> np.ndarray:
+    """
+    Normalise un vecteur de scores (version NumPy de normalize_scores)
+    
+    Args:
+        scores: Vecteur de scores
+        method: 'minmax' (entre 0 et 1) ou 'zscore' (moyenne 0, écart-type 1)
+        
+    Returns:
+        Vecteur de scores normalisés
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    
+    if len(scores) == 0:
+        return scores
+    
+    if method == 'minmax':
+        min_score = scores.min()
+        max_score = scores.max()
+        
+        # Éviter la division par zéro
+        if max_score == min_score:
+            return np.full(len(scores), 0.5)
+        
+        return (scores - min_score) / (max_score - min_score)
+    
+    if method == 'zscore':
+        std = scores.std()
+        
+        if std == 0:
+            return np.zeros(len(scores))
+        
+        return (scores - scores.mean()) / std
+    
+    raise ValueError(f"Méthode de normalisation inconnue : {method}")
@@ -0,0 +1,106 @@
+"""
+Utilitaires de sélection du top N sur des vecteurs de scores
+"""
+import numpy as np
+from typing import Optional
+
+
+def top_n_indices(
+    scores: np.ndarray,
+    n: int,
+    exclude: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Retourne les positions des N meilleurs scores (ordre décroissant)
+
+    Utilise un tri partiel (np.partition) puis trie uniquement les candidats
+    retenus. À score égal, la position la plus petite passe en premier,
+    comme un tri stable sur le catalogue.
+
+    Args:
+        scores: Vecteur de scores (1D)
+        n: Nombre de positions à retourner
+        exclude: Masque booléen des positions à ignorer (ex : films déjà vus)
+
+    Returns:
+        Tableau des positions retenues (au plus N)
+    """
+    if exclude is not None:
+        candidates = np.flatnonzero(~exclude)
+    else:
+        candidates = np.arange(len(scores))
+
+    if n <= 0 or len(candidates) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    values = scores[candidates]
+
+    # Tri partiel : ne garder que les candidats >= au N-ième meilleur score
+    if n < len(candidates):
+        kth = len(values) - n
+        threshold = np.partition(values, kth)[kth]
+        keep = values >= threshold
+        candidates = candidates[keep]
+        values = values[keep]
+
+    order = np.lexsort((candidates, -values))[:n]
+
+    return candidates[order]
+
+
+def top_n_rows(scores: np.ndarray, n: int, chunk_size: int = 4_000_000) -> np.ndarray:
+    """
+    Retourne, pour chaque ligne d'une matrice de scores, les positions des N
+    meilleurs scores (ordre décroissant)
+
+    Les positions masquées doivent valoir -inf ; elles ne sont jamais
+    retournées et les lignes incomplètes sont complétées par -1. Le résultat
+    est identique à top_n_indices appliqué ligne par ligne.
+
+    Args:
+        scores: Matrice de scores (n_rows x n_cols)
+        n: Nombre de positions à retourner par ligne
+        chunk_size: Nombre max de scores traités à la fois (mémoire
+            temporaire bornée)
+
+    Returns:
+        Matrice des positions (n_rows x N), complétée par -1
+    """
+    n_rows, n_cols = scores.shape
+    result = np.full((n_rows, n), -1, dtype=np.intp)
+    k = min(n, n_cols)
+
+    if k <= 0 or n_rows == 0:
+        return result
+
+    # Sélection par (score, position) sans boucle par ligne : les scores
+    # strictement supérieurs au K-ième, puis les premiers ex aequo dans l'ordre
+    # des colonnes. Les égalités à la frontière sont la norme, pas l'exception
+    # (notes écrêtées, TF-IDF des seuls genres), argpartition seul ne suffit pas
+    chunk_rows = max(1, chunk_size // n_cols)
+    for start in range(0, n_rows, chunk_rows):
+        block = scores[start:start + chunk_rows]
+        m = len(block)
+        threshold = np.partition(block, n_cols - k, axis=1)[:, n_cols - k:n_cols - k + 1]
+
+        above_rows, above_cols = np.nonzero(block > threshold)
+        tied_rows, tied_cols = np.nonzero(block == threshold)
+
+        # Rang de chaque ex aequo dans sa ligne, comparé aux places restantes
+        quota = k - np.bincount(above_rows, minlength=m)
+        tied_counts = np.bincount(tied_rows, minlength=m)
+        tied_rank = np.arange(len(tied_rows)) - np.repeat(np.cumsum(tied_counts) - tied_counts, tied_counts)
+        keep = tied_rank < quota[tied_rows]
+
+        # Exactement K colonnes par ligne, croissantes : tri stable par score
+        rows = np.concatenate([above_rows, tied_rows[keep]])
+        cols = np.concatenate([above_cols, tied_cols[keep]])
+        cols = cols[np.lexsort((cols, rows))].reshape(m, k)
+        order = np.argsort(-np.take_along_axis(block, cols, axis=1), axis=1, kind='stable')
+        result[start:start + m, :k] = np.take_along_axis(cols, order, axis=1)
+
+    # Positions masquées restées dans le top K
+    masked_top = np.isneginf(np.take_along_axis(scores, np.maximum(result[:, :k], 0), axis=1))
+    result[:, :k][masked_top & (result[:, :k] >= 0)] = -1
+
+    return result